@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Historical backfill from the Wikipedia article's revision history
+Lists every revision of "Estonia at the 2026 Winter Olympics", downloads their
+wikitext in batches and runs the wikitext extractors over each revision in
+parallel, producing a per-revision timeline of medal tallies and results.
+
+Everything is cached under .cache/backfill, so an interrupted backfill resumes
+where it stopped:
+    python backfill_wikipedia.py [--output timeline.json] [--reparse] [--workers N]
+"""
+
+import argparse
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import wikitext_parser
+# scraper_wikipedia also sets up UTF-8 console output on Windows
+from scraper_wikipedia import WIKIPEDIA_PAGE_TITLE, fetch_api
+
+CACHE_DIR = os.path.join('.cache', 'backfill')
+REVISIONS_FILE = os.path.join(CACHE_DIR, 'revisions.json')
+CONTENT_DIR = os.path.join(CACHE_DIR, 'content')
+RESULTS_FILE = os.path.join(CACHE_DIR, 'results.jsonl')
+DEFAULT_OUTPUT = os.path.join(CACHE_DIR, 'timeline.json')
+
+# The API allows up to 50 revision contents per request
+CONTENT_BATCH_SIZE = 50
+FETCH_WORKERS = 2
+
+
+def load_revision_list():
+    """Load the cached revision list and continuation state"""
+    try:
+        with open(REVISIONS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'revisions': [], 'continue': None, 'complete': False}
+
+
+def save_revision_list(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_file = REVISIONS_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, REVISIONS_FILE)
+
+
+def list_revisions():
+    """List all revisions (oldest first) with API continuation, resuming from cache"""
+    state = load_revision_list()
+    known = {revision['revid'] for revision in state['revisions']}
+
+    # A finished listing only needs the revisions made since
+    if state['complete'] and state['revisions']:
+        state['continue'] = {'rvstartid': state['revisions'][-1]['revid']}
+
+    while True:
+        params = {
+            'action': 'query',
+            'prop': 'revisions',
+            'titles': WIKIPEDIA_PAGE_TITLE,
+            'rvprop': 'ids|timestamp',
+            'rvlimit': 'max',
+            'rvdir': 'newer'
+        }
+        if state['continue']:
+            params.update(state['continue'])
+
+        data = fetch_api(params)
+        if not data:
+            print("Could not list revisions - run again to resume")
+            save_revision_list(state)
+            return state['revisions']
+
+        pages = data.get('query', {}).get('pages', [])
+        for revision in (pages[0].get('revisions', []) if pages else []):
+            if revision['revid'] not in known:
+                known.add(revision['revid'])
+                state['revisions'].append({'revid': revision['revid'], 'timestamp': revision['timestamp']})
+
+        state['continue'] = data.get('continue')
+        state['complete'] = state['continue'] is None
+        save_revision_list(state)
+        print(f"  Listed {len(state['revisions'])} revisions...")
+
+        if state['complete']:
+            return state['revisions']
+
+
+def content_path(revid):
+    return os.path.join(CONTENT_DIR, f"{revid}.wiki.gz")
+
+
+def fetch_content_batch(revids):
+    """Fetch and cache the wikitext of up to CONTENT_BATCH_SIZE revisions"""
+    data = fetch_api({
+        'action': 'query',
+        'prop': 'revisions',
+        'revids': '|'.join(str(revid) for revid in revids),
+        'rvprop': 'ids|content',
+        'rvslots': 'main'
+    })
+    if not data:
+        return 0
+
+    saved = 0
+    for page in data.get('query', {}).get('pages', []):
+        for revision in page.get('revisions', []):
+            content = revision.get('slots', {}).get('main', {}).get('content')
+            if content is None:
+                # Deleted/suppressed revisions have no content - cached empty, marked hidden later
+                content = ''
+            tmp_file = content_path(revision['revid']) + '.tmp'
+            with gzip.open(tmp_file, 'wt', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_file, content_path(revision['revid']))
+            saved += 1
+    return saved
+
+
+def fetch_missing_contents(revisions):
+    """Download wikitext for every revision not cached yet"""
+    os.makedirs(CONTENT_DIR, exist_ok=True)
+    missing = [r['revid'] for r in revisions if not os.path.exists(content_path(r['revid']))]
+    if not missing:
+        return
+
+    batches = [missing[i:i + CONTENT_BATCH_SIZE] for i in range(0, len(missing), CONTENT_BATCH_SIZE)]
+    print(f"Fetching wikitext for {len(missing)} revisions in {len(batches)} batches...")
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        for saved in executor.map(fetch_content_batch, batches):
+            done += saved
+            print(f"  {done}/{len(missing)} revisions downloaded")
+
+
+def process_revision(revision):
+    """Run the extractors over one cached revision (runs in a worker process)"""
+    try:
+        with gzip.open(content_path(revision['revid']), 'rt', encoding='utf-8') as f:
+            wikitext = f.read()
+    except (FileNotFoundError, OSError):
+        return None
+
+    entry = {'revid': revision['revid'], 'timestamp': revision['timestamp']}
+    if not wikitext.strip():
+        # Deleted/suppressed or blanked revision - there is nothing to extract
+        entry['hidden'] = True
+        return entry
+    try:
+        entry['medals'] = wikitext_parser.extract_medal_count(wikitext)
+        entry['competitors'] = wikitext_parser.extract_competitors(wikitext)
+        entry['results'] = wikitext_parser.extract_results_from_sections(wikitext)
+    except Exception as e:
+        entry['error'] = str(e)
+    return entry
+
+
+def load_processed_results():
+    """Load per-revision results processed by earlier runs"""
+    processed = {}
+    try:
+        with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Partially written last line of an interrupted run
+                    continue
+                processed[entry['revid']] = entry
+    except FileNotFoundError:
+        pass
+    return processed
+
+
+def process_revisions(revisions, workers=None, reparse=False):
+    """Extract every revision in parallel, appending results to the on-disk cache"""
+    if reparse and os.path.exists(RESULTS_FILE):
+        os.remove(RESULTS_FILE)
+    processed = load_processed_results()
+    pending = [r for r in revisions if r['revid'] not in processed and os.path.exists(content_path(r['revid']))]
+
+    if pending:
+        print(f"Extracting {len(pending)} revisions ({len(processed)} already processed)...")
+        # An interrupted run may have left a partial last line - start on a fresh one
+        if os.path.exists(RESULTS_FILE) and os.path.getsize(RESULTS_FILE):
+            with open(RESULTS_FILE, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+            if needs_newline:
+                with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+                    f.write('\n')
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                open(RESULTS_FILE, 'a', encoding='utf-8') as out:
+            for i, entry in enumerate(executor.map(process_revision, pending, chunksize=16), 1):
+                if entry is None:
+                    continue
+                out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                processed[entry['revid']] = entry
+                if i % 200 == 0:
+                    out.flush()
+                    print(f"  {i}/{len(pending)} revisions extracted")
+
+    return processed
+
+
+def build_timeline(revisions, processed):
+    """Per-revision timeline in revision order, marking tally changes
+
+    Hidden (deleted/blanked) revisions and revisions whose tally couldn't be
+    extracted are listed without a tally and don't count as a change.
+    """
+    timeline = []
+    previous_medals = None
+    for revision in revisions:
+        entry = processed.get(revision['revid'])
+        if not entry:
+            continue
+        if entry.get('hidden'):
+            timeline.append({'revid': entry['revid'], 'timestamp': entry['timestamp'], 'hidden': True,
+                             'medals': None, 'medals_changed': False})
+            continue
+        if entry.get('medals') is None:
+            timeline.append({'revid': entry['revid'], 'timestamp': entry['timestamp'],
+                             'medals': None, 'medals_changed': False, 'error': entry.get('error', 'no tally')})
+            continue
+        medals = entry.get('medals')
+        timeline.append({
+            'revid': entry['revid'],
+            'timestamp': entry['timestamp'],
+            'medals': medals,
+            'medals_changed': previous_medals is not None and medals != previous_medals,
+            'competitors': entry.get('competitors', []),
+            'results': entry.get('results', []),
+            **({'error': entry['error']} if 'error' in entry else {})
+        })
+        previous_medals = medals
+    return timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill a medal/results timeline from Wikipedia revision history")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="timeline JSON file to write")
+    parser.add_argument('--workers', type=int, default=None, help="extractor processes (default: CPU count)")
+    parser.add_argument('--reparse', action='store_true', help="re-run extractors over all cached revisions")
+    args = parser.parse_args()
+
+    print(f"Backfilling revision history of {WIKIPEDIA_PAGE_TITLE}")
+    revisions = list_revisions()
+    fetch_missing_contents(revisions)
+    processed = process_revisions(revisions, args.workers, args.reparse)
+
+    timeline = build_timeline(revisions, processed)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(timeline, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "="*60)
+    print(f"Timeline: {len(timeline)} of {len(revisions)} revisions -> {args.output}")
+    for entry in timeline:
+        if entry['medals_changed'] and entry['medals']:
+            medals = entry['medals']
+            print(f"  {entry['timestamp']} (rev {entry['revid']}): "
+                  f"Gold: {medals['gold']}, Silver: {medals['silver']}, Bronze: {medals['bronze']}")
+    hidden = sum(1 for entry in timeline if entry.get('hidden'))
+    if hidden:
+        print(f"Skipped {hidden} deleted/blanked revisions (marked 'hidden' in the timeline)")
+    errors = sum(1 for entry in timeline if 'error' in entry)
+    if errors:
+        print(f"Extractor errors on {errors} revisions (see 'error' in the timeline)")
+
+
+if __name__ == "__main__":
+    main()
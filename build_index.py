@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Prerender index.html from data.json for Milano Cortina 2026
+Renders the medal answer, medal counter and event lists straight into the page
+and embeds the data as an inline, hash-stamped JSON block so the site is
+meaningful at first paint. script.js hydrates from that block and keeps polling.
+"""
+
+import hashlib
+import html
+import json
+import re
+import sys
+
+from models import load_data
+
+# Set UTF-8 encoding for console output
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+DATA_FILE = 'data.json'
+INDEX_FILE = 'index.html'
+
+MEDAL_EMOJIS = {
+    'gold': '🥇',
+    'silver': '🥈',
+    'bronze': '🥉'
+}
+
+def escape(value):
+    """HTML-escape a data value"""
+    return html.escape(str(value), quote=True)
+
+def data_hash(data):
+    """Stable hash of the data used to stamp the inline block"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+def render_answer(medals):
+    """Render the Yes/No answer (mirrors updateMedalAnswer in script.js)"""
+    if sum(medals.values()) > 0:
+        return '<div class="answer yes" id="answer">Yes</div>'
+    return '<div class="answer no" id="answer">No</div>'
+
+def render_medals(medals):
+    """Render the medal counter (mirrors updateMedalCounter in script.js)"""
+    items = []
+    for medal_type in ['gold', 'silver', 'bronze']:
+        items.append(
+            '<div class="medal-item">'
+            f'<span class="medal-icon {medal_type}">{MEDAL_EMOJIS[medal_type]}</span>'
+            f'<span class="medal-count" id="{medal_type}Count">{escape(medals.get(medal_type, 0))}</span>'
+            '</div>'
+        )
+    return '\n'.join(items)
+
+def render_completed(athletes):
+    """Render completed events (mirrors updateCompletedEvents in script.js)"""
+    if not athletes:
+        return '<p class="empty-message">No completed events yet</p>'
+
+    cards = []
+    for athlete in athletes:
+        medal = athlete.get('medal')
+        badge = f' <span class="medal-badge">{MEDAL_EMOJIS.get(medal, "")}</span>' if medal else ''
+        result = f'<div class="athlete-result">{escape(athlete["result"])}</div>' if athlete.get('result') else ''
+        cards.append(
+            f'<div class="athlete-card {escape(medal or "")}">'
+            f'<div class="athlete-name">{escape(athlete.get("name", ""))}{badge}</div>'
+            f'<div class="athlete-sport">{escape(athlete.get("sport", ""))}</div>'
+            f'{result}'
+            '</div>'
+        )
+    return '\n'.join(cards)
+
+def render_upcoming(athletes):
+    """Render upcoming events (mirrors updateUpcomingEvents in script.js)"""
+    if not athletes:
+        return '<p class="empty-message">No upcoming events</p>'
+
+    cards = []
+    for athlete in athletes:
+        datetime_html = f'<div class="athlete-datetime">📅 {escape(athlete["datetime"])}</div>' if athlete.get('datetime') else ''
+        cards.append(
+            '<div class="athlete-card">'
+            f'<div class="athlete-name">{escape(athlete.get("name", ""))}</div>'
+            f'<div class="athlete-sport">{escape(athlete.get("sport", ""))}</div>'
+            f'{datetime_html}'
+            '</div>'
+        )
+    return '\n'.join(cards)
+
+def render_data_block(data, stamp):
+    """Render the inline JSON data block used by script.js for hydration"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    # Keep the payload from closing the script element early
+    payload = payload.replace('</', '<\\/')
+    return f'<script id="initialData" type="application/json" data-hash="{stamp}">{payload}</script>'
+
+def replace_region(page, name, content):
+    """Replace the content between <!-- prerender:name --> markers"""
+    pattern = re.compile(
+        r'(?P<indent>[ \t]*)<!-- prerender:' + name + r' -->.*?<!-- /prerender:' + name + r' -->',
+        re.S
+    )
+    match = pattern.search(page)
+    if not match:
+        print(f"Warning: prerender marker '{name}' not found in {INDEX_FILE}")
+        return page
+
+    indent = match.group('indent')
+    lines = [f'{indent}<!-- prerender:{name} -->']
+    lines += [f'{indent}{line}' for line in content.split('\n')]
+    lines.append(f'{indent}<!-- /prerender:{name} -->')
+    return page[:match.start()] + '\n'.join(lines) + page[match.end():]
+
+def build_index(data_file=DATA_FILE, index_file=INDEX_FILE):
+    """Render data.json into index.html. Returns True if the page changed."""
+    data = load_data(data_file).to_dict()
+    with open(index_file, 'r', encoding='utf-8') as f:
+        page = f.read()
+
+    stamp = data_hash(data)
+    if f'data-hash="{stamp}"' in page:
+        print(f"{index_file} already rendered from current data (hash {stamp})")
+        return False
+
+    medals = data.get('medals', {'gold': 0, 'silver': 0, 'bronze': 0})
+    page = replace_region(page, 'answer', render_answer(medals))
+    page = replace_region(page, 'medals', render_medals(medals))
+    page = replace_region(page, 'completed', render_completed(data.get('completed', [])))
+    page = replace_region(page, 'upcoming', render_upcoming(data.get('upcoming', [])))
+    page = replace_region(page, 'data', render_data_block(data, stamp))
+
+    with open(index_file, 'w', encoding='utf-8') as f:
+        f.write(page)
+
+    print(f"Prerendered {index_file} (hash {stamp}): "
+          f"{len(data.get('completed', []))} completed, {len(data.get('upcoming', []))} upcoming")
+    return True
+
+if __name__ == "__main__":
+    build_index()
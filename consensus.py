@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Cross-source consensus for the Estonia Olympics scrapers
+Every scraper submits what it saw (medal tally and athlete rows) as a
+timestamped observation instead of writing data.json itself. Observations are
+weighted by source reliability and age, the tally currently in data.json votes
+as well (so a single source has to be fairly sure to move it), and data.json
+is only rewritten when the winning tally's share of the total weight (its
+confidence) is above CONFIDENCE_THRESHOLD and the change - up or down - is
+confirmed: by two agreeing sources, by the same source reporting it on
+MIN_CONFIRMATIONS runs in a row, or by the source behind the last change
+retracting it. An all-zero tally (what a failed extraction looks like) is not
+a vote at all.
+Disagreements between sources are appended to CONFLICT_LOG.
+
+Show the current standings:
+    python consensus.py
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from locking import file_lock
+from metrics import to_timestamp
+from models import MEDAL_TYPES, MedalTally, load_data, save_data
+
+OBSERVATIONS_FILE = os.path.join('.cache', 'observations.json')
+CONFLICT_LOG = os.path.join('.cache', 'conflicts.jsonl')
+LOCK_FILE = os.path.join('.cache', 'consensus.lock')
+
+# How much each source's word counts (Wikipedia is edited and sourced, ERR
+# tallies are summed from headline regexes)
+SOURCE_WEIGHTS = {
+    'wikipedia': 1.0,
+    'olympics.com': 0.8,
+    'err': 0.35,
+}
+DEFAULT_WEIGHT = 0.3
+
+# The published data.json tally votes too, so it takes more than one noisy
+# source to change it
+PUBLISHED_WEIGHT = 0.5
+
+# Observations lose half their weight every HALF_LIFE_HOURS and are dropped after MAX_AGE_HOURS
+HALF_LIFE_HOURS = 6
+MAX_AGE_HOURS = 24
+
+# The winning tally needs more than half of the total weight
+CONFIDENCE_THRESHOLD = 0.5
+
+# One bad scrape (or a vandalised infobox) must not move the site's tally in
+# either direction: a change needs this many agreeing sources or consecutive
+# identical observations from one source
+MIN_CONFIRMATIONS = 2
+
+
+class ConsensusResult:
+    """Outcome of submitting one observation"""
+
+    __slots__ = ('medals', 'confidence', 'accepted', 'published', 'conflicts')
+
+    def __init__(self, medals, confidence, accepted, published, conflicts):
+        self.medals = medals
+        self.confidence = confidence
+        # The consensus tally matches what the submitting source reported
+        self.accepted = accepted
+        # data.json was rewritten with a new tally
+        self.published = published
+        self.conflicts = conflicts
+
+    def __repr__(self):
+        return (f"ConsensusResult({self.medals!r}, confidence={self.confidence:.2f}, "
+                f"accepted={self.accepted}, published={self.published})")
+
+
+def load_observations():
+    """Load the latest observation per source"""
+    try:
+        with open(OBSERVATIONS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'sources': {}, 'logged_conflicts': []}
+
+
+def save_observations(state):
+    os.makedirs(os.path.dirname(OBSERVATIONS_FILE), exist_ok=True)
+    tmp_file = OBSERVATIONS_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, OBSERVATIONS_FILE)
+
+
+def source_weight(source, observed_at, now):
+    """Reliability weight of a source's observation, decayed by its age"""
+    age_hours = max(0.0, now - observed_at) / 3600
+    return SOURCE_WEIGHTS.get(source, DEFAULT_WEIGHT) * 0.5 ** (age_hours / HALF_LIFE_HOURS)
+
+
+def athlete_key(name):
+    return ' '.join(name.lower().split())
+
+
+def athlete_votes(rows):
+    """Medal colours per athlete from a source's rows
+
+    Only rows with a result or medal count; result texts differ too much
+    between sources to compare, so athletes are compared on medals alone.
+    """
+    votes = {}
+    for row in rows:
+        name = row.get('name', '')
+        if not name or not (row.get('result') or row.get('medal')):
+            continue
+        medals = votes.setdefault(athlete_key(name), set())
+        if row.get('medal'):
+            medals.add(row['medal'])
+    return {name: sorted(medals, key=MEDAL_TYPES.index) for name, medals in votes.items()}
+
+
+def tally_votes(observations, published, now):
+    """Weighted votes per (gold, silver, bronze) tally"""
+    votes = {}
+    for source, observation in observations.items():
+        tally = tuple(observation['medals'][medal_type] for medal_type in MEDAL_TYPES)
+        weight = source_weight(source, observation['observed_at'], now)
+        vote = votes.setdefault(tally, {'weight': 0.0, 'sources': []})
+        vote['weight'] += weight
+        vote['sources'].append(source)
+
+    tally = (published.gold, published.silver, published.bronze)
+    vote = votes.setdefault(tally, {'weight': 0.0, 'sources': []})
+    vote['weight'] += PUBLISHED_WEIGHT
+    vote['sources'].append('data.json')
+    return votes
+
+
+def find_conflicts(observations, published_athletes, votes, now):
+    """Describe every tally or athlete the voters don't agree on"""
+    conflicts = []
+    if len(votes) > 1:
+        conflicts.append({
+            'kind': 'medals',
+            'votes': [{'tally': dict(zip(MEDAL_TYPES, tally)),
+                       'weight': round(vote['weight'], 3),
+                       'sources': vote['sources']}
+                      for tally, vote in sorted(votes.items(), key=lambda item: -item[1]['weight'])]
+        })
+
+    per_source = {'data.json': (PUBLISHED_WEIGHT, published_athletes)}
+    for source, observation in observations.items():
+        if observation.get('athletes'):
+            per_source[source] = (source_weight(source, observation['observed_at'], now),
+                                  athlete_votes(observation['athletes']))
+
+    names = set()
+    for _, athletes in per_source.values():
+        names.update(athletes)
+    for name in sorted(names):
+        values = {}
+        for source, (weight, athletes) in per_source.items():
+            if name in athletes:
+                vote = values.setdefault(tuple(athletes[name]), {'weight': 0.0, 'sources': []})
+                vote['weight'] += weight
+                vote['sources'].append(source)
+        if len(values) > 1:
+            conflicts.append({
+                'kind': 'athlete',
+                'name': name,
+                'votes': [{'medals': list(medals), 'weight': round(vote['weight'], 3),
+                           'sources': vote['sources']}
+                          for medals, vote in sorted(values.items(), key=lambda item: -item[1]['weight'])]
+            })
+    return conflicts
+
+
+def log_conflicts(state, conflicts, now):
+    """Append conflicts not logged yet to CONFLICT_LOG"""
+    logged = set(state.get('logged_conflicts', []))
+    current = []
+    new_entries = []
+    for conflict in conflicts:
+        signature = json.dumps([conflict['kind'], conflict.get('name'),
+                                sorted((json.dumps(v.get('tally', v.get('medals'))), sorted(v['sources']))
+                                       for v in conflict['votes'])], ensure_ascii=False)
+        current.append(signature)
+        if signature not in logged:
+            new_entries.append(conflict)
+
+    if new_entries:
+        logged_at = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        with open(CONFLICT_LOG, 'a', encoding='utf-8') as f:
+            for conflict in new_entries:
+                f.write(json.dumps({'logged_at': logged_at, **conflict}, ensure_ascii=False) + '\n')
+    # Forget resolved conflicts so they are logged again if they come back
+    state['logged_conflicts'] = current
+    return new_entries
+
+
+def is_confirmed(state, voters, consensus, published):
+    """Whether a change from the published tally to consensus is confirmed"""
+    observations = state['sources']
+    if len(voters) >= MIN_CONFIRMATIONS:
+        return True
+    if any(observations[name].get('streak', 1) >= MIN_CONFIRMATIONS for name in voters):
+        return True
+    # The source that caused the last change takes it back (e.g. reverted vandalism)
+    last_change = state.get('last_change')
+    return bool(last_change and
+                last_change['tally'] == published.to_dict() and
+                last_change['previous'] == consensus.to_dict() and
+                set(voters) & set(last_change['sources']))
+
+
+def submit(source, medals, athletes=None, observed_at=None):
+    """Record a source's observation and publish the consensus tally to data.json
+
+    medals is a MedalTally or dict, athletes an optional list of row dicts
+    (name, sport, result, medal). Returns a ConsensusResult.
+    """
+    if isinstance(medals, dict):
+        medals = MedalTally.from_dict(medals)
+    now = time.time()
+    observed_at = to_timestamp(observed_at) or now
+
+    if medals.total() == 0:
+        # A missing infobox or a partial fetch reads as 0-0-0 - don't let it vote
+        published = load_data().medals
+        print(f"Consensus: ignoring all-zero tally from {source} (not counted as a vote)")
+        return ConsensusResult(published, 0.0, published == medals, False, [])
+
+    with file_lock(LOCK_FILE):
+        state = load_observations()
+        observations = state['sources']
+        previous = observations.get(source)
+        streak = previous.get('streak', 1) + 1 if previous and previous['medals'] == medals.to_dict() else 1
+        observations[source] = {
+            'observed_at': observed_at,
+            'medals': medals.to_dict(),
+            'streak': streak,
+            'athletes': [{key: row[key] for key in ('name', 'sport', 'result', 'medal') if row.get(key)}
+                         for row in (athletes or [])]
+        }
+        for name in [name for name, observation in observations.items()
+                     if now - observation['observed_at'] > MAX_AGE_HOURS * 3600]:
+            print(f"Consensus: dropping stale observation from {name}")
+            del observations[name]
+
+        current_data = load_data()
+        votes = tally_votes(observations, current_data.medals, now)
+        total_weight = sum(vote['weight'] for vote in votes.values())
+        winner, winning_vote = max(votes.items(), key=lambda item: item[1]['weight'])
+        confidence = winning_vote['weight'] / total_weight
+        consensus = MedalTally(*winner)
+
+        published_athletes = athlete_votes([entry.to_dict() for entry in current_data.completed])
+        conflicts = find_conflicts(observations, published_athletes, votes, now)
+        new_conflicts = log_conflicts(state, conflicts, now)
+
+        published = False
+        voters = [name for name in winning_vote['sources'] if name != 'data.json']
+        if consensus != current_data.medals:
+            if confidence <= CONFIDENCE_THRESHOLD:
+                print(f"Consensus: {consensus} leads with confidence {confidence:.2f} "
+                      f"(<= {CONFIDENCE_THRESHOLD}) - keeping {current_data.medals}")
+                consensus = current_data.medals
+            elif not is_confirmed(state, voters, consensus, current_data.medals):
+                print(f"Consensus: {consensus} from {', '.join(voters)} awaits confirmation "
+                      f"(a second source or {MIN_CONFIRMATIONS} runs in a row) - keeping {current_data.medals}")
+                consensus = current_data.medals
+            else:
+                print(f"Consensus: publishing {consensus} "
+                      f"(confidence {confidence:.2f}, from {', '.join(winning_vote['sources'])})")
+                state['last_change'] = {'sources': voters, 'previous': current_data.medals.to_dict(),
+                                        'tally': consensus.to_dict()}
+                current_data.medals = consensus
+                save_data(current_data)
+                published = True
+        save_observations(state)
+
+    for conflict in new_conflicts:
+        if conflict['kind'] == 'medals':
+            print(f"Consensus: sources disagree on the medal tally (see {CONFLICT_LOG})")
+        else:
+            print(f"Consensus: sources disagree on {conflict['name']}'s medals (see {CONFLICT_LOG})")
+
+    return ConsensusResult(consensus, confidence, consensus == medals, published, conflicts)
+
+
+def main():
+    """Print the current votes and recent conflicts"""
+    state = load_observations()
+    now = time.time()
+    published = load_data().medals
+    votes = tally_votes(state['sources'], published, now)
+    total_weight = sum(vote['weight'] for vote in votes.values())
+
+    print(f"Published: {published}")
+    for tally, vote in sorted(votes.items(), key=lambda item: -item[1]['weight']):
+        print(f"  {dict(zip(MEDAL_TYPES, tally))}: {vote['weight'] / total_weight:.2f} "
+              f"({', '.join(vote['sources'])})")
+
+    try:
+        with open(CONFLICT_LOG, 'r', encoding='utf-8') as f:
+            recent = f.readlines()[-10:]
+    except FileNotFoundError:
+        recent = []
+    if recent:
+        print("\nRecent conflicts:")
+        for line in recent:
+            print(f"  {line.strip()}")
+
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    main()
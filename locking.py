@@ -0,0 +1,49 @@
+"""
+Cross-process file locks for state shared between scraper runs
+A lock file is held with flock (POSIX) or msvcrt.locking (Windows), plus a
+per-path thread lock so threads inside one process serialize as well.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _get_thread_lock(path):
+    with _thread_locks_guard:
+        if path not in _thread_locks:
+            _thread_locks[path] = threading.Lock()
+        return _thread_locks[path]
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path (created if missing) for the duration of the block"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with _get_thread_lock(os.path.abspath(path)):
+        with open(path, 'a+') as lock:
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Data-freshness metrics for the Estonia Olympics scrapers
+Each scraper run records when the upstream data was published (Wikipedia
+revision timestamp, RSS pubDate), when we detected it and when data.json was
+written. Lags are kept as histograms per source and exported in Prometheus
+text format to METRICS_FILE (for node_exporter's textfile collector).
+
+State lives in .cache/, which the hourly workflow restores and saves with
+actions/cache so histograms accumulate across runs.
+
+Daemon mode serves the same metrics over HTTP (localhost only by default):
+    python metrics.py --serve [port] [--host ADDRESS]
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from locking import file_lock
+
+STATE_FILE = os.path.join('.cache', 'freshness.json')
+LOCK_FILE = os.path.join('.cache', 'freshness.lock')
+METRICS_FILE = os.environ.get('METRICS_FILE', os.path.join('.cache', 'metrics.prom'))
+DEFAULT_PORT = 9108
+DEFAULT_HOST = '127.0.0.1'
+
+# Histogram buckets in seconds (1 min .. 1 day)
+LAG_BUCKETS = [60, 300, 600, 1800, 3600, 7200, 14400, 43200, 86400]
+
+HISTOGRAMS = {
+    'olympics_upstream_to_detect_seconds': 'Time from upstream publish/revision to our scraper detecting it',
+    'olympics_detect_to_write_seconds': 'Time from detection to data.json being written',
+    'olympics_upstream_to_write_seconds': 'Time from upstream publish/revision to data.json reflecting it',
+}
+
+GAUGES = {
+    'olympics_last_upstream_timestamp_seconds': 'Publish/revision time of the newest upstream data seen',
+    'olympics_last_detect_timestamp_seconds': 'When the newest upstream data was detected',
+    'olympics_last_write_timestamp_seconds': 'When data.json was last written',
+    'olympics_last_run_timestamp_seconds': 'When the scraper last ran',
+    'olympics_upstream_revision': 'Upstream revision id of the newest data seen (0 if the source has none)',
+}
+
+
+def load_state():
+    """Load recorded metrics state"""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'sources': {}}
+
+
+def save_state(state):
+    """Atomically write metrics state to disk"""
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_file = STATE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, STATE_FILE)
+
+
+def to_timestamp(value):
+    """Convert a datetime (naive = UTC) or number to a Unix timestamp"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def observe(source_state, name, value):
+    """Add an observation to a per-source histogram"""
+    histogram = source_state['histograms'].setdefault(name, {
+        'buckets': [0] * len(LAG_BUCKETS),
+        'sum': 0.0,
+        'count': 0
+    })
+    value = max(0.0, value)
+    for i, bound in enumerate(LAG_BUCKETS):
+        if value <= bound:
+            histogram['buckets'][i] += 1
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+
+def record_freshness(source, upstream_time, detected_time, written_time, revision=None):
+    """Record one scraper run. Lags are only observed for upstream data we haven't seen before."""
+    upstream_ts = to_timestamp(upstream_time)
+    detected_ts = to_timestamp(detected_time)
+    written_ts = to_timestamp(written_time)
+
+    # Scrapers may run concurrently - serialize the read-modify-write
+    with file_lock(LOCK_FILE):
+        state = load_state()
+        source_state = state['sources'].setdefault(source, {'gauges': {}, 'histograms': {}})
+        gauges = source_state['gauges']
+        gauges['olympics_last_run_timestamp_seconds'] = written_ts or detected_ts
+
+        if upstream_ts is not None:
+            last_upstream = gauges.get('olympics_last_upstream_timestamp_seconds')
+            last_revision = gauges.get('olympics_upstream_revision')
+            is_new = (last_upstream is None or upstream_ts > last_upstream or
+                      (revision is not None and revision != last_revision))
+
+            if is_new:
+                observe(source_state, 'olympics_upstream_to_detect_seconds', detected_ts - upstream_ts)
+                gauges['olympics_last_upstream_timestamp_seconds'] = upstream_ts
+                gauges['olympics_last_detect_timestamp_seconds'] = detected_ts
+                gauges['olympics_upstream_revision'] = revision or 0
+
+                if written_ts is not None:
+                    observe(source_state, 'olympics_detect_to_write_seconds', written_ts - detected_ts)
+                    observe(source_state, 'olympics_upstream_to_write_seconds', written_ts - upstream_ts)
+                    print(f"Freshness ({source}): upstream -> data.json took {written_ts - upstream_ts:.0f}s")
+
+        if written_ts is not None:
+            gauges['olympics_last_write_timestamp_seconds'] = written_ts
+
+        save_state(state)
+        write_textfile(state)
+
+
+def format_value(value):
+    """Format a metric value for the text exposition format"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_metrics(state):
+    """Render metrics state in Prometheus text exposition format"""
+    lines = []
+    sources = sorted(state.get('sources', {}).items())
+
+    for name, help_text in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for source, source_state in sources:
+            histogram = source_state['histograms'].get(name)
+            if not histogram:
+                continue
+            for bound, count in zip(LAG_BUCKETS, histogram['buckets']):
+                lines.append(f'{name}_bucket{{source="{source}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{source="{source}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'{name}_sum{{source="{source}"}} {format_value(histogram["sum"])}')
+            lines.append(f'{name}_count{{source="{source}"}} {histogram["count"]}')
+
+    for name, help_text in GAUGES.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        for source, source_state in sources:
+            value = source_state['gauges'].get(name)
+            if value is not None:
+                lines.append(f'{name}{{source="{source}"}} {format_value(value)}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(state=None):
+    """Atomically write the Prometheus text file"""
+    content = render_metrics(state or load_state())
+    directory = os.path.dirname(METRICS_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = METRICS_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_file, METRICS_FILE)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serve /metrics from the recorded state"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render_metrics(load_state()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port=DEFAULT_PORT, host=DEFAULT_HOST):
+    """Run the local metrics endpoint (daemon mode)"""
+    print(f"Serving freshness metrics on http://{host}:{port}/metrics")
+    HTTPServer((host, port), MetricsHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    if '--serve' in sys.argv:
+        index = sys.argv.index('--serve')
+        port = DEFAULT_PORT
+        if len(sys.argv) > index + 1 and sys.argv[index + 1].isdigit():
+            port = int(sys.argv[index + 1])
+        host = DEFAULT_HOST
+        if '--host' in sys.argv and len(sys.argv) > sys.argv.index('--host') + 1:
+            host = sys.argv[sys.argv.index('--host') + 1]
+        serve(port, host)
+    else:
+        write_textfile()
+        print(f"Wrote {METRICS_FILE}")
@@ -0,0 +1,176 @@
+"""
+Shared record model for the Estonia Olympics scrapers
+Typed, __slots__-based records for medal tallies, athlete entries and scheduled
+events, validated when data enters or leaves data.json, plus a serializer that
+writes the exact data.json layout (orjson is used when installed).
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATA_FILE = 'data.json'
+
+MEDAL_TYPES = ('gold', 'silver', 'bronze')
+
+
+class MedalTally:
+    """Gold/silver/bronze medal counts"""
+
+    __slots__ = ('gold', 'silver', 'bronze')
+
+    def __init__(self, gold=0, silver=0, bronze=0):
+        for medal_type, count in zip(MEDAL_TYPES, (gold, silver, bronze)):
+            if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+                raise ValueError(f"Invalid {medal_type} medal count: {count!r}")
+        self.gold = gold
+        self.silver = silver
+        self.bronze = bronze
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{medal_type: data.get(medal_type, 0) for medal_type in MEDAL_TYPES})
+
+    def to_dict(self):
+        return {'gold': self.gold, 'silver': self.silver, 'bronze': self.bronze}
+
+    def total(self):
+        return self.gold + self.silver + self.bronze
+
+    def __eq__(self, other):
+        if not isinstance(other, MedalTally):
+            return NotImplemented
+        return (self.gold, self.silver, self.bronze) == (other.gold, other.silver, other.bronze)
+
+    def __repr__(self):
+        return f"MedalTally(gold={self.gold}, silver={self.silver}, bronze={self.bronze})"
+
+
+class AthleteEntry:
+    """A completed event for one athlete or team"""
+
+    __slots__ = ('name', 'sport', 'result', 'medal', 'datetime', 'extra')
+
+    def __init__(self, name, sport, result='', medal=None, datetime=None, extra=None):
+        if not name or not isinstance(name, str):
+            raise ValueError(f"Athlete entry needs a name, got {name!r}")
+        if medal is not None and medal not in MEDAL_TYPES:
+            raise ValueError(f"Invalid medal for {name}: {medal!r}")
+        self.name = name
+        self.sport = sport or ''
+        self.result = result or ''
+        self.medal = medal
+        self.datetime = datetime
+        # Manually added fields we don't model are kept as-is (None when there are none)
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in cls.__slots__}
+        return cls(data.get('name'), data.get('sport'), data.get('result'),
+                   data.get('medal'), data.get('datetime'), extra)
+
+    def to_dict(self):
+        # Key order matches data.json: name, sport, [datetime], result, [medal]
+        data = {'name': self.name, 'sport': self.sport}
+        if self.datetime:
+            data['datetime'] = self.datetime
+        data['result'] = self.result
+        if self.medal:
+            data['medal'] = self.medal
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"AthleteEntry({self.name!r}, {self.sport!r}, result={self.result!r}, medal={self.medal!r})"
+
+
+class ScheduledEvent:
+    """An upcoming event for one athlete or team"""
+
+    __slots__ = ('name', 'sport', 'datetime', 'extra')
+
+    def __init__(self, name, sport, datetime='', extra=None):
+        if not name or not isinstance(name, str):
+            raise ValueError(f"Scheduled event needs a name, got {name!r}")
+        self.name = name
+        self.sport = sport or ''
+        self.datetime = datetime or ''
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in cls.__slots__}
+        return cls(data.get('name'), data.get('sport'), data.get('datetime'), extra)
+
+    def to_dict(self):
+        data = {'name': self.name, 'sport': self.sport}
+        if self.datetime:
+            data['datetime'] = self.datetime
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"ScheduledEvent({self.name!r}, {self.sport!r}, {self.datetime!r})"
+
+
+class OlympicsData:
+    """Everything stored in data.json"""
+
+    __slots__ = ('medals', 'completed', 'upcoming')
+
+    def __init__(self, medals=None, completed=None, upcoming=None):
+        self.medals = medals or MedalTally()
+        self.completed = completed or []
+        self.upcoming = upcoming or []
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            MedalTally.from_dict(data.get('medals', {})),
+            [AthleteEntry.from_dict(entry) for entry in data.get('completed', [])],
+            [ScheduledEvent.from_dict(entry) for entry in data.get('upcoming', [])]
+        )
+
+    def to_dict(self):
+        return {
+            'medals': self.medals.to_dict(),
+            'completed': [entry.to_dict() for entry in self.completed],
+            'upcoming': [entry.to_dict() for entry in self.upcoming]
+        }
+
+
+def dumps_data(data):
+    """Serialize to the data.json layout (2-space indent, UTF-8, no trailing newline)"""
+    if isinstance(data, OlympicsData):
+        data = data.to_dict()
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def loads_data(text):
+    """Parse and validate data.json content"""
+    raw = orjson.loads(text) if orjson is not None else json.loads(text)
+    return OlympicsData.from_dict(raw)
+
+
+def load_data(path=DATA_FILE):
+    """Load data.json, or an empty structure if it doesn't exist yet"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return loads_data(f.read())
+    except FileNotFoundError:
+        print(f"No existing {path} found - creating default structure")
+        return OlympicsData()
+
+
+def save_data(data, path=DATA_FILE):
+    """Write data.json in its exact layout"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(dumps_data(data))
@@ -0,0 +1,155 @@
+"""
+Per-host token-bucket rate limiter shared by all scrapers
+Bucket state lives in a small JSON file guarded by a lock file, so scrapers
+running at the same time (threads or separate processes) share one budget per
+host. Throttling signals (429/503, Retry-After, MediaWiki maxlag) halve the
+host's rate and pause it; successful requests slowly raise it back up.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from locking import file_lock
+
+STATE_FILE = os.path.join('.cache', 'rate_limits.json')
+LOCK_FILE = os.path.join('.cache', 'rate_limits.lock')
+
+# (max requests per second, burst size) per host
+HOST_LIMITS = {
+    'en.wikipedia.org': (2.0, 5),
+    'sport.err.ee': (2.0, 4),
+    'news.err.ee': (2.0, 4),
+    'www.err.ee': (2.0, 4),
+    'www.olympics.com': (0.5, 2),
+}
+DEFAULT_LIMIT = (1.0, 3)
+
+# Adaptive back-off: halve the rate when throttled, recover a little per success
+MIN_RATE = 0.05
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.05
+DEFAULT_RETRY_AFTER = 30
+
+
+class RateLimited(requests.RequestException):
+    """Raised when a host tells us to slow down"""
+
+
+def get_host_limit(host):
+    """Max rate and burst for a host"""
+    return HOST_LIMITS.get(host, DEFAULT_LIMIT)
+
+
+@contextmanager
+def _locked_state():
+    """Yield the shared bucket state while holding the lock file"""
+    with file_lock(LOCK_FILE):
+        try:
+            with open(STATE_FILE, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = {}
+
+        yield state
+
+        tmp_file = STATE_FILE + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, STATE_FILE)
+
+
+def _get_bucket(state, host, now):
+    """Get a host's bucket, refilled up to now"""
+    max_rate, burst = get_host_limit(host)
+    bucket = state.setdefault(host, {
+        'tokens': burst,
+        'rate': max_rate,
+        'updated': now,
+        'blocked_until': 0
+    })
+    elapsed = max(0.0, now - bucket['updated'])
+    bucket['tokens'] = min(burst, bucket['tokens'] + elapsed * bucket['rate'])
+    bucket['updated'] = now
+    return bucket
+
+
+def acquire(url):
+    """Block until a request to url's host is allowed"""
+    host = urlparse(url).netloc
+    while True:
+        with _locked_state() as state:
+            now = time.time()
+            bucket = _get_bucket(state, host, now)
+
+            if now < bucket['blocked_until']:
+                wait = bucket['blocked_until'] - now
+            elif bucket['tokens'] >= 1:
+                bucket['tokens'] -= 1
+                return
+            else:
+                wait = (1 - bucket['tokens']) / bucket['rate']
+
+        if wait > 1:
+            print(f"Rate limit: waiting {wait:.1f}s for {host}")
+        time.sleep(wait)
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttled(response):
+    """Check a response for 429/503 or a MediaWiki maxlag error"""
+    if response.status_code in (429, 503):
+        return True
+    return response.headers.get('MediaWiki-API-Error') == 'maxlag'
+
+
+def report(url, response):
+    """Adapt a host's rate to the response we got back"""
+    host = urlparse(url).netloc
+    max_rate, _ = get_host_limit(host)
+    throttled = is_throttled(response)
+
+    with _locked_state() as state:
+        now = time.time()
+        bucket = _get_bucket(state, host, now)
+
+        if throttled:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER
+            bucket['blocked_until'] = max(bucket['blocked_until'], now + retry_after)
+            bucket['rate'] = max(MIN_RATE, bucket['rate'] * BACKOFF_FACTOR)
+            bucket['tokens'] = 0
+        else:
+            bucket['rate'] = min(max_rate, bucket['rate'] + max_rate * RECOVERY_STEP)
+
+    if throttled:
+        print(f"Rate limit: {host} asked us to slow down "
+              f"(status {response.status_code}, retry after {retry_after:.0f}s)")
+        raise RateLimited(f"Throttled by {host}", response=response)
+
+
+def get(url, session=None, **kwargs):
+    """requests.get that waits for the host's rate limit and adapts to throttling"""
+    acquire(url)
+    response = (session or requests).get(url, **kwargs)
+    report(url, response)
+    return response
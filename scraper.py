@@ -5,7 +5,6 @@ Fetches medal counts from Olympics.com and updates data.json
 Athlete data must be manually updated
 """
 
-import json
 import requests
 from bs4 import BeautifulSoup
 import time
@@ -14,6 +13,10 @@ import re
 import sys
 import os
 
+import rate_limiter
+import consensus
+from models import MedalTally, load_data
+
 # Set UTF-8 encoding for console output
 if sys.platform == 'win32':
     import codecs
@@ -39,7 +42,7 @@ def fetch_page(url, retries=3):
     for attempt in range(retries):
         try:
             session = requests.Session()
-            response = session.get(url, headers=HEADERS, timeout=20, allow_redirects=True)
+            response = rate_limiter.get(url, session=session, headers=HEADERS, timeout=20, allow_redirects=True)
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
@@ -132,16 +135,7 @@ def parse_medal_count(html):
 
 def load_current_data():
     """Load existing data from file"""
-    try:
-        with open('data.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("No existing data.json found - creating default structure")
-        return {
-            "medals": {"gold": 0, "silver": 0, "bronze": 0},
-            "completed": [],
-            "upcoming": []
-        }
+    return load_data()
 
 def main():
     """Main scraper function"""
@@ -151,13 +145,9 @@ def main():
     # Load current data
     current_data = load_current_data()
 
-    old_total = (current_data['medals']['gold'] +
-                 current_data['medals']['silver'] +
-                 current_data['medals']['bronze'])
-
-    print(f"Current medals: Gold: {current_data['medals']['gold']}, "
-          f"Silver: {current_data['medals']['silver']}, "
-          f"Bronze: {current_data['medals']['bronze']}")
+    print(f"Current medals: Gold: {current_data.medals.gold}, "
+          f"Silver: {current_data.medals.silver}, "
+          f"Bronze: {current_data.medals.bronze}")
 
     # Try to fetch medal counts from multiple URLs
     print("Fetching medal counts from Olympics.com...")
@@ -172,32 +162,23 @@ def main():
         medals = parse_medal_count(medal_html)
 
         if medals:
-            # Check if medals increased
-            new_total = medals['gold'] + medals['silver'] + medals['bronze']
-
-            if new_total > old_total:
-                print(f"MEDALS UPDATED! New medals: Gold: {medals['gold']}, "
-                      f"Silver: {medals['silver']}, Bronze: {medals['bronze']}")
-                current_data['medals'] = medals
-            elif new_total == old_total and medals != current_data['medals']:
-                # Medal composition changed (e.g., traded a silver for a gold)
-                print(f"Medal composition changed: {medals}")
-                current_data['medals'] = medals
+            # data.json is only rewritten if the sources agree on the new tally
+            result = consensus.submit('olympics.com', MedalTally.from_dict(medals))
+            if result.published:
+                print(f"MEDALS UPDATED! New medals: Gold: {result.medals.gold}, "
+                      f"Silver: {result.medals.silver}, Bronze: {result.medals.bronze}")
             else:
-                print("No medal changes detected")
+                print("No medal changes published")
+            current_data.medals = result.medals
         else:
             print("Could not parse medals from page. Keeping existing data.")
     else:
         print("Could not fetch medal pages. Keeping existing data.")
 
-    # Write updated data (even if unchanged, to verify workflow is running)
-    with open('data.json', 'w', encoding='utf-8') as f:
-        json.dump(current_data, f, indent=2, ensure_ascii=False)
-
-    total_medals = current_data['medals']['gold'] + current_data['medals']['silver'] + current_data['medals']['bronze']
+    total_medals = current_data.medals.total()
     print(f"Update complete! Total medals: {total_medals}")
-    print(f"Athletes: {len(current_data.get('completed', []))} completed, "
-          f"{len(current_data.get('upcoming', []))} upcoming")
+    print(f"Athletes: {len(current_data.completed)} completed, "
+          f"{len(current_data.upcoming)} upcoming")
     print("\nTo update athlete data:")
     print("1. Go to: https://github.com/YOUR_USERNAME/YOUR_REPO/edit/main/data.json")
     print("2. Move athletes from 'upcoming' to 'completed' and add results")
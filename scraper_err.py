@@ -6,12 +6,23 @@ Data source: https://sport.err.ee
 """
 
 import json
-import requests
 from bs4 import BeautifulSoup
 import xml.etree.ElementTree as ET
+import hashlib
+import os
 import re
 import sys
-from datetime import datetime
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, urlunparse
+
+import metrics
+import rate_limiter
+import consensus
+from models import MedalTally, load_data
 
 # Set UTF-8 encoding for console output
 if sys.platform == 'win32':
@@ -19,19 +30,47 @@ if sys.platform == 'win32':
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-# Data sources
-ERR_RSS_FEED = "https://sport.err.ee/rss"
+# Data sources - the same story is often published on several of these feeds
+ERR_RSS_FEEDS = [
+    "https://sport.err.ee/rss",
+    "https://news.err.ee/rss",
+    "https://www.err.ee/rss",
+]
 ERR_OLYMPICS_PAGE = "https://sport.err.ee/k/om2026"
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 }
 
+# Article body crawler settings
+ARTICLE_CACHE_FILE = os.path.join('.cache', 'err_articles.json')
+# Bump when process_article_body changes so cached results are re-extracted
+ARTICLE_CACHE_VERSION = 3
+CRAWL_MAX_WORKERS = 8
+CRAWL_PER_HOST_LIMIT = 3
+CRAWL_MAX_ARTICLES = 40
+
+# A body sentence only counts if it names Estonia or an Estonian athlete.
+# Surnames that are ordinary words (tuul = wind, laine = wave, külm = cold, ...)
+# only count with the first name; a short case ending is allowed ("Sildarule").
+ESTONIAN_SURNAMES = ['talihärm', 'kulbin', 'sildaru', 'ermits', 'siimer', 'kehva', 'zahkna',
+                     'meentalo', 'kaasiku', 'pulles', 'ojaste', 'dremljuga', 'himma', 'kaldvee',
+                     'selevko', 'zunte', 'aigro', 'petrõkina', 'vagul']
+ESTONIAN_FULL_NAMES = ['kristjan ilves', 'susan külm', 'tuuli tomingas', 'mai brit teder',
+                       'ruubert teder', 'tormis laine', 'teesi tuul', 'alvar johannes alev',
+                       'harri lill', 'marten liiv']
+ESTONIAN_CONTEXT_RE = re.compile(
+    r'\b(?:eesti|eestla\w*|estonia|' + '|'.join(ESTONIAN_SURNAMES + ESTONIAN_FULL_NAMES) +
+    r')(?:[a-zäöõüšž]{0,4})\b', re.I)
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
 def fetch_url(url, retries=3):
     """Fetch URL with retries"""
     for attempt in range(retries):
         try:
-            response = requests.get(url, headers=HEADERS, timeout=20)
+            response = rate_limiter.get(url, headers=HEADERS, timeout=20)
             response.raise_for_status()
             return response.text
         except Exception as e:
@@ -41,40 +80,125 @@ def fetch_url(url, retries=3):
                 time.sleep(3)
     return None
 
-def parse_err_rss_feed():
-    """Parse ERR RSS feed for Olympics news"""
-    print("Fetching ERR RSS feed...")
-    rss_content = fetch_url(ERR_RSS_FEED)
+def parse_rss_items(rss_content):
+    """Parse Olympics items out of one RSS feed"""
+    root = ET.fromstring(rss_content)
+    articles = []
+
+    for item in root.findall('.//item'):
+        title = item.find('title').text if item.find('title') is not None else ''
+        link = item.find('link').text if item.find('link') is not None else ''
+        description = item.find('description').text if item.find('description') is not None else ''
+        pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
+        guid = item.find('guid').text if item.find('guid') is not None else ''
+
+        # Filter for Olympics content
+        olympics_keywords = ['olümpia', 'olympic', 'milano', 'cortina', 'om2026']
+        if any(keyword in (title or '').lower() or keyword in (description or '').lower()
+               for keyword in olympics_keywords):
+            articles.append({
+                'title': title or '',
+                'link': link or '',
+                'description': description or '',
+                'pub_date': pub_date or '',
+                'guid': guid or ''
+            })
 
-    if not rss_content:
-        return []
+    return articles
 
-    try:
-        root = ET.fromstring(rss_content)
-        articles = []
-
-        for item in root.findall('.//item'):
-            title = item.find('title').text if item.find('title') is not None else ''
-            link = item.find('link').text if item.find('link') is not None else ''
-            description = item.find('description').text if item.find('description') is not None else ''
-            pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
-
-            # Filter for Olympics content
-            olympics_keywords = ['olümpia', 'olympics', 'milano', 'cortina', 'om2026']
-            if any(keyword in title.lower() or keyword in description.lower() for keyword in olympics_keywords):
-                articles.append({
-                    'title': title,
-                    'link': link,
-                    'description': description,
-                    'pub_date': pub_date
-                })
-
-        print(f"Found {len(articles)} Olympics articles in RSS feed")
-        return articles
+def canonical_link(link):
+    """Canonical form of an article link, shared across ERR subdomains"""
+    if not link:
+        return ''
+    parsed = urlparse(link.strip())
+    host = parsed.netloc.lower()
 
-    except Exception as e:
-        print(f"Error parsing RSS feed: {e}")
-        return []
+    # ERR serves the same story id on sport.err.ee, www.err.ee, ... - key on the id
+    if host.endswith('err.ee'):
+        match = re.match(r'/(\d{6,})', parsed.path)
+        if match:
+            return f"err:{match.group(1)}"
+
+    return urlunparse(('https', host, parsed.path.rstrip('/'), '', '', ''))
+
+def title_hash(title):
+    """Hash of a normalized title (case, accents, punctuation and spacing ignored)"""
+    text = unicodedata.normalize('NFKD', (title or '').lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+    return hashlib.sha1(text.encode('utf-8')).hexdigest() if text else ''
+
+def story_keys(article):
+    """All keys identifying a story: GUID, canonical link and title hash"""
+    keys = set()
+    if article.get('guid'):
+        keys.add(f"guid:{article['guid'].strip()}")
+    link = canonical_link(article.get('link', ''))
+    if link:
+        keys.add(f"link:{link}")
+    digest = title_hash(article.get('title', ''))
+    if digest:
+        keys.add(f"title:{digest}")
+    return keys
+
+def deduplicate_articles(articles, seen=None):
+    """Drop articles already seen under any of their keys"""
+    seen = set() if seen is None else seen
+    unique = []
+    for article in articles:
+        keys = story_keys(article)
+        if keys & seen:
+            continue
+        seen.update(keys)
+        unique.append(article)
+    return unique
+
+def parse_pub_date(article):
+    """Parse an article's RFC 822 pubDate into an aware datetime"""
+    try:
+        pub_date = parsedate_to_datetime(article.get('pub_date', ''))
+    except (TypeError, ValueError):
+        return None
+    if pub_date.tzinfo is None:
+        pub_date = pub_date.replace(tzinfo=timezone.utc)
+    return pub_date
+
+def pub_date_sort_key(article):
+    """Sort key for newest-first ordering (undated items go last)"""
+    pub_date = parse_pub_date(article)
+    return pub_date.timestamp() if pub_date else 0
+
+def parse_err_rss_feed(feeds=None):
+    """Fetch all ERR RSS feeds concurrently and return deduplicated Olympics articles"""
+    feeds = feeds or ERR_RSS_FEEDS
+    print(f"Fetching {len(feeds)} ERR RSS feeds...")
+
+    with ThreadPoolExecutor(max_workers=min(CRAWL_MAX_WORKERS, len(feeds))) as executor:
+        contents = list(executor.map(fetch_url_limited, feeds))
+
+    articles = []
+    for feed, rss_content in zip(feeds, contents):
+        if not rss_content:
+            continue
+        try:
+            feed_articles = parse_rss_items(rss_content)
+        except Exception as e:
+            print(f"Error parsing RSS feed {feed}: {e}")
+            continue
+        print(f"  {feed}: {len(feed_articles)} Olympics articles")
+        articles.extend(feed_articles)
+
+    # Deduplicate before any regex extraction runs, newest first
+    articles.sort(key=pub_date_sort_key, reverse=True)
+    unique = deduplicate_articles(articles)
+    print(f"Found {len(unique)} unique Olympics articles ({len(articles) - len(unique)} duplicates dropped)")
+    return unique
+
+def get_newest_pub_date(articles):
+    """Newest RSS pubDate among the articles (used for freshness metrics)"""
+    pub_dates = [parse_pub_date(article) for article in articles]
+    pub_dates = [pub_date for pub_date in pub_dates if pub_date]
+    return max(pub_dates) if pub_dates else None
 
 def extract_medal_info(text):
     """Extract ESTONIAN medal information from text"""
@@ -141,6 +265,131 @@ def extract_athlete_result(text, title):
 
     return None
 
+def load_article_cache():
+    """Load processed article cache (keyed by URL and content hash)"""
+    try:
+        with open(ARTICLE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == ARTICLE_CACHE_VERSION:
+            cache.setdefault('urls', {})
+            cache.setdefault('hashes', {})
+            return cache
+    except (FileNotFoundError, ValueError):
+        pass
+    return {'version': ARTICLE_CACHE_VERSION, 'urls': {}, 'hashes': {}}
+
+def save_article_cache(cache):
+    """Write processed article cache to disk"""
+    try:
+        os.makedirs(os.path.dirname(ARTICLE_CACHE_FILE), exist_ok=True)
+        with open(ARTICLE_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        print(f"Could not write article cache: {e}")
+
+def get_host_semaphore(url):
+    """Get the shared semaphore limiting concurrent requests to a host"""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(CRAWL_PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
+def fetch_url_limited(url):
+    """Fetch URL while holding the per-host concurrency slot"""
+    with get_host_semaphore(url):
+        return fetch_url(url)
+
+def extract_article_body(html):
+    """Extract the main text of an ERR article page"""
+    soup = BeautifulSoup(html, 'lxml')
+
+    for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
+        tag.decompose()
+
+    # ERR article pages keep the story inside <article> / a "text" container
+    container = (soup.find('article') or
+                 soup.find('div', class_=re.compile(r'^(text|body|content)$')) or
+                 soup.body or soup)
+
+    paragraphs = [p.get_text(' ', strip=True) for p in container.find_all(['p', 'h1', 'h2'])]
+    body = ' '.join(p for p in paragraphs if p)
+    if not body:
+        body = container.get_text(' ', strip=True)
+    return body
+
+def split_sentences(text):
+    """Split article text into sentences (keeps "6. koht" together)"""
+    return [s for s in re.split(r'(?<=[.!?])\s+(?=[A-ZÄÖÜÕŠŽ"„])', text) if s]
+
+def process_article_body(body):
+    """Run medal and placement extraction over the sentences of an article body
+    that mention Estonia or an Estonian athlete
+
+    Bodies also cover other countries' results, so a sentence is only used if
+    the Estonian mention and the placement/medal word appear in it together.
+    """
+    placement = None
+    medals = {'gold': 0, 'silver': 0, 'bronze': 0}
+    for sentence in split_sentences(body):
+        if not ESTONIAN_CONTEXT_RE.search(sentence):
+            continue
+        if not placement:
+            placement = extract_athlete_result(sentence, sentence)
+        for medal_type, count in extract_medal_info(sentence).items():
+            if count:
+                medals[medal_type] = 1
+    return {
+        'placement': placement,
+        'medals': medals
+    }
+
+def crawl_err_articles(links):
+    """Fetch and parse new article bodies concurrently, reusing cached results"""
+    cache = load_article_cache()
+    results = {}
+
+    # Articles already processed are never downloaded again
+    new_links = []
+    for link in links:
+        if not link or link in results:
+            continue
+        cached = cache['urls'].get(link)
+        if cached and cached.get('hash') in cache['hashes']:
+            results[link] = cache['hashes'][cached['hash']]
+        elif link not in new_links:
+            new_links.append(link)
+
+    new_links = new_links[:CRAWL_MAX_ARTICLES]
+    print(f"Article crawler: {len(results)} cached, {len(new_links)} to fetch")
+
+    if new_links:
+        with ThreadPoolExecutor(max_workers=CRAWL_MAX_WORKERS) as executor:
+            pages = list(executor.map(fetch_url_limited, new_links))
+
+        for link, html in zip(new_links, pages):
+            if not html:
+                continue
+            try:
+                body = extract_article_body(html)
+            except Exception as e:
+                print(f"Error extracting article body from {link}: {e}")
+                continue
+
+            # The same story can be published under several links - parse it once
+            content_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
+            if content_hash not in cache['hashes']:
+                cache['hashes'][content_hash] = process_article_body(body)
+            cache['urls'][link] = {
+                'hash': content_hash,
+                'fetched': datetime.utcnow().isoformat()
+            }
+            results[link] = cache['hashes'][content_hash]
+
+        save_article_cache(cache)
+
+    return results
+
 def parse_olympics_page():
     """Parse ERR Olympics dedicated page for detailed results"""
     print("Fetching ERR Olympics page...")
@@ -195,6 +444,21 @@ def parse_olympics_page():
             except Exception as e:
                 continue
 
+        # Follow article links and feed their bodies into the extraction
+        article_links = [item['link'] for item in results
+                         if urlparse(item['link']).netloc.endswith('err.ee')]
+        bodies = crawl_err_articles(article_links)
+
+        for item in results:
+            body_info = bodies.get(item['link'])
+            if not body_info:
+                continue
+            # Body results only fill in a missing placement - body medal mentions
+            # are too noisy to count towards the tally
+            if not item['placement'] and body_info.get('placement'):
+                item['placement'] = body_info['placement']
+            item['body_medals'] = body_info.get('medals', {})
+
         print(f"Extracted {len(results)} Estonian-related items from Olympics page")
         return results
 
@@ -208,28 +472,25 @@ def update_data_from_err():
     print("Data source: ERR (Estonian Public Broadcasting)")
 
     # Load current data
-    try:
-        with open('data.json', 'r', encoding='utf-8') as f:
-            current_data = json.load(f)
-    except FileNotFoundError:
-        current_data = {
-            "medals": {"gold": 0, "silver": 0, "bronze": 0},
-            "completed": [],
-            "upcoming": []
-        }
-
-    print(f"Current medals: Gold: {current_data['medals']['gold']}, "
-          f"Silver: {current_data['medals']['silver']}, "
-          f"Bronze: {current_data['medals']['bronze']}")
+    current_data = load_data()
+
+    print(f"Current medals: Gold: {current_data.medals.gold}, "
+          f"Silver: {current_data.medals.silver}, "
+          f"Bronze: {current_data.medals.bronze}")
 
     # Parse RSS feed
     articles = parse_err_rss_feed()
+    newest_pub_date = get_newest_pub_date(articles)
+    detected_time = datetime.now(timezone.utc)
 
     # Check for medal mentions in recent articles
     total_medals = {'gold': 0, 'silver': 0, 'bronze': 0}
     athlete_updates = []
+    counted_stories = set()
 
     for article in articles[:20]:  # Check last 20 articles
+        counted_stories.update(story_keys(article))
+
         # Check for medal info
         text = article['title'] + ' ' + article['description']
         medals = extract_medal_info(text)
@@ -246,16 +507,8 @@ def update_data_from_err():
                 'link': article['link']
             })
 
-    # Update medal counts if found
     if sum(total_medals.values()) > 0:
         print(f"Found medal mentions: {total_medals}")
-        # Only update if medals increased
-        old_total = sum(current_data['medals'].values())
-        new_total = sum(total_medals.values())
-
-        if new_total > old_total:
-            print("MEDALS UPDATED!")
-            current_data['medals'] = total_medals
 
     # Display athlete updates found
     if athlete_updates:
@@ -273,7 +526,12 @@ def update_data_from_err():
 
         # Check for additional medal info
         for item in olympics_page_results:
-            item_medals = item.get('medals', {})
+            # Stories already counted from RSS (or earlier on the page) don't count twice
+            item_keys = story_keys({'link': item.get('link', ''), 'title': item.get('text', '')})
+            already_counted = bool(item_keys & counted_stories)
+            counted_stories.update(item_keys)
+
+            item_medals = {} if already_counted else item.get('medals', {})
             for medal_type in ['gold', 'silver', 'bronze']:
                 if item_medals.get(medal_type, 0) > 0:
                     print(f"Found {medal_type} medal mention: {item['text'][:100]}")
@@ -282,27 +540,32 @@ def update_data_from_err():
             # Log any placement info found
             if item.get('placement'):
                 print(f"  Result found: {item['placement']} - {item['link']}")
+            body_medals = [m for m, count in item.get('body_medals', {}).items() if count]
+            if body_medals:
+                print(f"  Article body mentions {', '.join(body_medals)} (not counted): {item['link']}")
 
-        # Update medals if new ones found
-        if sum(total_medals.values()) > sum(current_data['medals'].values()):
-            print("\nNEW MEDALS DETECTED from Olympics page!")
-            current_data['medals'] = total_medals
-
-    # Write updated data
-    with open('data.json', 'w', encoding='utf-8') as f:
-        json.dump(current_data, f, indent=2, ensure_ascii=False)
+    # Headline tallies are only a low-weight vote - no mentions is not a vote for zero
+    written_time = None
+    if sum(total_medals.values()) > 0:
+        result = consensus.submit('err', MedalTally.from_dict(total_medals), observed_at=detected_time)
+        if result.published:
+            print("\nMEDALS UPDATED!")
+            written_time = datetime.now(timezone.utc)
+        current_data.medals = result.medals
+    metrics.record_freshness('err', newest_pub_date, detected_time, written_time)
 
     print("\n" + "="*60)
     print(f"Update complete!")
-    print(f"Total medals: {sum(current_data['medals'].values())}")
-    print(f"Athletes: {len(current_data.get('completed', []))} completed, "
-          f"{len(current_data.get('upcoming', []))} upcoming")
+    print(f"Total medals: {current_data.medals.total()}")
+    print(f"Athletes: {len(current_data.completed)} completed, "
+          f"{len(current_data.upcoming)} upcoming")
     print("\nData sources checked:")
-    print(f"  - ERR RSS Feed: {len(articles)} Olympics articles")
+    print(f"  - ERR RSS Feeds: {len(articles)} unique Olympics articles")
     print(f"  - ERR Olympics Page: {len(olympics_page_results)} Estonian items")
     print("\nFor detailed results, see:")
     print("  ERR Olympics: https://sport.err.ee/k/om2026")
-    print("  ERR RSS: https://sport.err.ee/rss")
+    for feed in ERR_RSS_FEEDS:
+        print(f"  ERR RSS: {feed}")
 
 if __name__ == "__main__":
     update_data_from_err()
@@ -5,12 +5,22 @@ Main data source: Wikipedia (Estonia at the 2026 Winter Olympics)
 URL: https://en.wikipedia.org/wiki/Estonia_at_the_2026_Winter_Olympics
 """
 
+import html
 import json
-import requests
 from bs4 import BeautifulSoup
+from lxml import etree
+import os
 import re
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+import metrics
+import rate_limiter
+import wikitext_parser
+import consensus
+from models import AthleteEntry, MedalTally, load_data
 
 # Set UTF-8 encoding for console output
 if sys.platform == 'win32':
@@ -20,6 +30,26 @@ if sys.platform == 'win32':
 
 # Main data source
 WIKIPEDIA_URL = "https://en.wikipedia.org/wiki/Estonia_at_the_2026_Winter_Olympics"
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+WIKIPEDIA_PAGE_TITLE = "Estonia_at_the_2026_Winter_Olympics"
+
+# Schedule-aware scraping: only sports with an Estonian event in the last
+# LIVE_WINDOW_HOURS are re-extracted, with a full sweep every FULL_SWEEP_EVERY_HOURS
+LIVE_WINDOW_HOURS = 6
+FULL_SWEEP_EVERY_HOURS = 6
+FULL_SWEEP_STATE_FILE = os.path.join('.cache', 'full_sweep.json')
+# Scheduled runs start a few minutes late - don't push the sweep back an hour for that
+FULL_SWEEP_SLACK = timedelta(minutes=15)
+CET = timezone(timedelta(hours=1))
+
+# Extraction engine: 'html' (rendered article) or 'wikitext' (raw wikitext via the API)
+# Set with the EXTRACTION_ENGINE env var or per run with --engine=wikitext
+EXTRACTION_ENGINES = ('html', 'wikitext')
+EXTRACTION_ENGINE = os.environ.get('EXTRACTION_ENGINE', 'html')
+
+# Streaming fetch: chunk size and safety cap on bytes read before giving up
+STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_MAX_BYTES = 2 * 1024 * 1024
 
 # Wikipedia-friendly headers
 HEADERS = {
@@ -30,16 +60,197 @@ def fetch_url(url, retries=3):
     """Fetch URL with retries"""
     for attempt in range(retries):
         try:
-            response = requests.get(url, headers=HEADERS, timeout=20)
+            response = rate_limiter.get(url, headers=HEADERS, timeout=20)
             response.raise_for_status()
             return response.text
         except Exception as e:
             print(f"Attempt {attempt + 1} failed for {url}: {e}")
             if attempt < retries - 1:
-                import time
                 time.sleep(3)
     return None
 
+def fetch_api(params):
+    """Call the MediaWiki API and return the decoded JSON response"""
+    # maxlag makes the API refuse us (and the rate limiter back off) when replicas lag
+    query = dict(params, format='json', formatversion=2, maxlag=5)
+    content = fetch_url(f"{WIKIPEDIA_API_URL}?{urlencode(query)}")
+    if not content:
+        return None
+    try:
+        data = json.loads(content)
+    except ValueError as e:
+        print(f"Invalid API response: {e}")
+        return None
+    if 'error' in data:
+        print(f"API error: {data['error'].get('info', data['error'])}")
+        return None
+    return data
+
+def fetch_latest_revision():
+    """Get the article's latest revision id and timestamp (used for freshness metrics)"""
+    data = fetch_api({
+        'action': 'query',
+        'prop': 'revisions',
+        'titles': WIKIPEDIA_PAGE_TITLE,
+        'rvprop': 'ids|timestamp',
+        'rvlimit': 1
+    })
+    if not data:
+        return None, None
+
+    pages = data.get('query', {}).get('pages', [])
+    if not pages or not pages[0].get('revisions'):
+        return None, None
+
+    revision = pages[0]['revisions'][0]
+    timestamp = datetime.strptime(revision['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    return revision['revid'], timestamp
+
+def fetch_wikitext(revision_id=None):
+    """Fetch the article's wikitext with its revision id and timestamp
+
+    Returns (revid, timestamp, wikitext) or (None, None, None) on failure.
+    """
+    params = {
+        'action': 'query',
+        'prop': 'revisions',
+        'rvprop': 'ids|timestamp|content',
+        'rvslots': 'main'
+    }
+    if revision_id:
+        params['revids'] = revision_id
+    else:
+        params['titles'] = WIKIPEDIA_PAGE_TITLE
+        params['rvlimit'] = 1
+
+    data = fetch_api(params)
+    if not data:
+        return None, None, None
+
+    pages = data.get('query', {}).get('pages', [])
+    if not pages or not pages[0].get('revisions'):
+        return None, None, None
+
+    revision = pages[0]['revisions'][0]
+    timestamp = datetime.strptime(revision['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    return revision['revid'], timestamp, revision['slots']['main']['content']
+
+def get_extraction_engine():
+    """Extraction engine for this run (--engine=... overrides the EXTRACTION_ENGINE env var)"""
+    engine = EXTRACTION_ENGINE
+    for arg in sys.argv[1:]:
+        if arg.startswith('--engine='):
+            engine = arg.split('=', 1)[1]
+    if engine not in EXTRACTION_ENGINES:
+        raise ValueError(f"Unknown extraction engine {engine!r} (choose from {', '.join(EXTRACTION_ENGINES)})")
+    return engine
+
+def parse_schedule_datetime(text):
+    """Parse a data.json datetime like 'Feb 12, 2026 - 2:15 PM CET' (time may be TBD)
+
+    Returns (start in UTC, has_time) or (None, False) if the date can't be read.
+    """
+    match = re.match(r'\s*([A-Z][a-z]{2} \d{1,2}, \d{4})(?:\s*-\s*(\d{1,2}:\d{2}\s*[AP]M))?', text or '')
+    if not match:
+        return None, False
+
+    try:
+        if match.group(2):
+            start = datetime.strptime(f"{match.group(1)} {match.group(2).replace(' ', '')}", '%b %d, %Y %I:%M%p')
+            return start.replace(tzinfo=CET).astimezone(timezone.utc), True
+        start = datetime.strptime(match.group(1), '%b %d, %Y')
+        return start.replace(tzinfo=CET).astimezone(timezone.utc), False
+    except ValueError:
+        return None, False
+
+def normalize_sport_name(name):
+    """Normalize a sport name so 'Cross-Country Skiing' matches 'Cross-country skiing'"""
+    return re.sub(r'[^a-z]+', ' ', name.lower()).strip()
+
+def get_live_sports(current_data, now=None):
+    """Work out which sports had an Estonian event in the last few hours"""
+    now = now or datetime.now(timezone.utc)
+    window = timedelta(hours=LIVE_WINDOW_HOURS)
+    live_sports = set()
+
+    for event in current_data.upcoming:
+        start, has_time = parse_schedule_datetime(event.datetime)
+        if not start:
+            continue
+
+        if has_time:
+            is_live = start <= now <= start + window
+        else:
+            # Time still TBD - treat the whole competition day (CET) as live
+            is_live = start <= now < start + timedelta(days=1) + window
+
+        if is_live:
+            sport = event.sport.split(' - ')[0]
+            if sport:
+                live_sports.add(normalize_sport_name(sport))
+
+    return live_sports
+
+def load_last_full_sweep():
+    """When the last full sweep ran (None if never)"""
+    try:
+        with open(FULL_SWEEP_STATE_FILE, 'r', encoding='utf-8') as f:
+            return datetime.fromisoformat(json.load(f)['last_full_sweep'])
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return None
+
+def record_full_sweep(now=None):
+    """Remember that a full sweep just completed"""
+    now = now or datetime.now(timezone.utc)
+    os.makedirs(os.path.dirname(FULL_SWEEP_STATE_FILE), exist_ok=True)
+    tmp_file = FULL_SWEEP_STATE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'last_full_sweep': now.isoformat()}, f)
+    os.replace(tmp_file, FULL_SWEEP_STATE_FILE)
+
+def should_run_full_sweep(now=None, last_sweep=None):
+    """Sweep once the last full sweep is FULL_SWEEP_EVERY_HOURS old
+
+    The last sweep time is kept in .cache/, so delayed or skipped scheduled
+    runs only postpone the sweep to the next run that happens.
+    """
+    if '--full' in sys.argv:
+        return True
+    now = now or datetime.now(timezone.utc)
+    last_sweep = last_sweep or load_last_full_sweep()
+    if last_sweep is None:
+        return True
+    return now - last_sweep >= timedelta(hours=FULL_SWEEP_EVERY_HOURS) - FULL_SWEEP_SLACK
+
+def fetch_live_sections(live_sports):
+    """Fetch the lead (infobox) and the live sport sections via the MediaWiki parse API"""
+    data = fetch_api({'action': 'parse', 'page': WIKIPEDIA_PAGE_TITLE, 'prop': 'sections'})
+    if not data:
+        return None
+
+    section_indexes = ['0']
+    for section in data.get('parse', {}).get('sections', []):
+        # Top-level sport sections include their event subsections
+        if section.get('toclevel') == 1 and normalize_sport_name(section.get('line', '')) in live_sports:
+            section_indexes.append(section['index'])
+
+    print(f"Fetching {len(section_indexes) - 1} live sport section(s) plus the lead")
+
+    html_parts = []
+    for index in section_indexes:
+        section_data = fetch_api({
+            'action': 'parse',
+            'page': WIKIPEDIA_PAGE_TITLE,
+            'section': index,
+            'prop': 'text',
+            'disableeditsection': 1
+        })
+        if not section_data:
+            return None
+        html_parts.append(section_data.get('parse', {}).get('text', ''))
+
+    return BeautifulSoup('\n'.join(html_parts), 'lxml')
+
 def extract_medal_count_from_infobox(soup):
     """Extract medal count from Wikipedia infobox"""
     medals = {'gold': 0, 'silver': 0, 'bronze': 0}
@@ -268,13 +479,10 @@ def merge_athlete_data(existing_data, new_athletes):
     # This is a conservative merge - we don't want to overwrite manual updates
     # Only update medal counts automatically
 
-    completed = existing_data.get('completed', [])
-    upcoming = existing_data.get('upcoming', [])
-
     # Track athlete names we already have
     existing_names = set()
-    for athlete in completed + upcoming:
-        existing_names.add(athlete.get('name', '').lower())
+    for athlete in existing_data.completed + existing_data.upcoming:
+        existing_names.add(athlete.name.lower())
 
     # Add new athletes if they're not already tracked
     new_completed = []
@@ -287,52 +495,224 @@ def merge_athlete_data(existing_data, new_athletes):
 
         # If athlete has a result, add to completed
         if athlete.get('result') or athlete.get('medal'):
-            new_completed.append({
-                'name': athlete.get('name', ''),
-                'sport': athlete.get('sport', '') + (f" - {athlete.get('event', '')}" if athlete.get('event') else ''),
-                'result': athlete.get('result', ''),
-                'medal': athlete.get('medal')
-            })
+            try:
+                new_completed.append(AthleteEntry(
+                    athlete.get('name', ''),
+                    athlete.get('sport', '') + (f" - {athlete.get('event', '')}" if athlete.get('event') else ''),
+                    athlete.get('result', ''),
+                    athlete.get('medal')
+                ))
+            except ValueError as e:
+                print(f"Skipping invalid athlete entry: {e}")
 
     return new_completed
 
+def extract_from_html(live_sports):
+    """Extract medals and athletes from the rendered article HTML
+
+    live_sports is None for a full sweep, otherwise only those sections are fetched.
+    Returns (medals, competitors, results, revision_id, revision_time, detected_time) or None.
+    """
+    soup = None
+    full_sweep = live_sports is None
+    if not full_sweep:
+        soup = fetch_live_sections(live_sports)
+        if soup is None:
+            print("Could not fetch live sections. Falling back to a full sweep.")
+            full_sweep = True
+
+    if full_sweep:
+        print("Running full sweep of the Wikipedia article")
+        page_content = fetch_url(WIKIPEDIA_URL)
+
+        if not page_content:
+            return None
+
+        # Parse with BeautifulSoup
+        soup = BeautifulSoup(page_content, 'lxml')
+
+    # Upstream revision for freshness metrics
+    revision_id, revision_time = fetch_latest_revision()
+    detected_time = datetime.now(timezone.utc)
+    if revision_id:
+        print(f"Latest revision: {revision_id} ({revision_time.isoformat()})")
+
+    # Extract medal count from infobox
+    medals = extract_medal_count_from_infobox(soup)
+
+    # Extract competitor information (the competitors table is only covered by full sweeps)
+    competitors = extract_competitors_table(soup) if full_sweep else []
+    results = extract_results_from_sections(soup)
+
+    return medals, competitors, results, revision_id, revision_time, detected_time
+
+def has_class(element, class_name):
+    """Check an lxml element's class attribute"""
+    return class_name in (element.get('class') or '').split()
+
+def infobox_matcher():
+    """Matcher completing on the end of the infobox table"""
+    def match(element):
+        return element.tag == 'table' and has_class(element, 'infobox')
+    return match
+
+def section_table_matcher(section_id):
+    """Matcher completing on the end of the first wikitable after the section's heading"""
+    state = {'in_section': False}
+
+    def match(element):
+        if element.tag in ('h2', 'h3') and element.get('id') == section_id:
+            state['in_section'] = True
+            return False
+        return state['in_section'] and element.tag == 'table' and has_class(element, 'wikitable')
+    return match
+
+def fetch_streamed_elements(url, matchers, max_bytes=STREAM_MAX_BYTES, retries=3):
+    """Stream a page into an incremental lxml parser and stop once every matcher has completed
+
+    matchers maps a name to a factory returning a callable that is given each
+    completed element (a fresh one per attempt, as matchers may keep state).
+    Failed or truncated downloads are retried like fetch_url.
+    Returns {name: element HTML} for the elements found (possibly partial on failure).
+    """
+    found = {}
+    for attempt in range(retries):
+        pending = {name: factory() for name, factory in matchers.items() if name not in found}
+        try:
+            response = rate_limiter.get(url, headers=HEADERS, timeout=20, stream=True)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Attempt {attempt + 1} failed for {url}: {e}")
+        else:
+            parser = etree.HTMLPullParser(events=('end',), encoding='utf-8')
+            received = 0
+            try:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    received += len(chunk)
+                    parser.feed(chunk)
+
+                    for _, element in parser.read_events():
+                        for name, matcher in pending.items():
+                            if name not in found and matcher(element):
+                                found[name] = etree.tostring(element, encoding='unicode', method='html', with_tail=False)
+                        # Drop finished blocks outside tables so memory stays flat
+                        # (table contents must survive until the table itself completes)
+                        if element.tag in ('table', 'p', 'ul', 'ol') and next(element.iterancestors('table'), None) is None:
+                            element.clear()
+
+                    if len(found) == len(matchers):
+                        print(f"Found {', '.join(found)} after {received // 1024} KB - stopping download")
+                        return found
+                    if received >= max_bytes:
+                        print(f"Stopped streaming {url} at the {max_bytes // 1024} KB cap")
+                        return found
+                # The whole page arrived without the missing elements - retrying won't help
+                return found
+            except Exception as e:
+                print(f"Attempt {attempt + 1} failed while streaming {url}: {e}")
+            finally:
+                response.close()
+
+        if attempt < retries - 1:
+            time.sleep(3)
+    return found
+
+def get_stream_section():
+    """Section id from --section=... (used with --medals-only), or None"""
+    for arg in sys.argv[1:]:
+        if arg.startswith('--section='):
+            return arg.split('=', 1)[1]
+    return None
+
+def extract_medals_only(section_id=None):
+    """Quick medal-only check: stream the article only until the infobox is complete
+
+    With a section_id (the heading's id, e.g. 'Biathlon'), streaming continues
+    until that section's first wikitable is complete and its rows are returned
+    as results. Returns the same tuple as extract_from_html.
+    """
+    matchers = {'infobox': infobox_matcher}
+    if section_id:
+        print(f"Medal-only check: streaming the article until the infobox and the {section_id} table are complete")
+        matchers['section'] = lambda: section_table_matcher(section_id)
+    else:
+        print("Medal-only check: streaming the article until the infobox is complete")
+    found = fetch_streamed_elements(WIKIPEDIA_URL, matchers)
+    if 'infobox' not in found:
+        return None
+
+    revision_id, revision_time = fetch_latest_revision()
+    detected_time = datetime.now(timezone.utc)
+
+    medals = extract_medal_count_from_infobox(BeautifulSoup(found['infobox'], 'lxml'))
+    results = []
+    if section_id:
+        if 'section' in found:
+            # Re-attach a heading so the regular section extractor can read the table
+            sport_name = html.escape(section_id.replace('_', ' '))
+            results = extract_results_from_sections(BeautifulSoup(f"<h2>{sport_name}</h2>{found['section']}", 'lxml'))
+        else:
+            print(f"No wikitable found for section {section_id}")
+    return medals, [], results, revision_id, revision_time, detected_time
+
+def extract_from_wikitext(live_sports):
+    """Extract medals and athletes from the article wikitext (one small API request)
+
+    live_sports is None for a full sweep, otherwise only those sections are parsed.
+    Returns (medals, competitors, results, revision_id, revision_time, detected_time) or None.
+    """
+    revision_id, revision_time, wikitext = fetch_wikitext()
+    if wikitext is None:
+        return None
+    detected_time = datetime.now(timezone.utc)
+    print(f"Fetched wikitext of revision {revision_id} ({revision_time.isoformat()}, {len(wikitext)} chars)")
+
+    full_sweep = live_sports is None
+    include = None if full_sweep else (lambda title: normalize_sport_name(title) in live_sports)
+
+    medals = wikitext_parser.extract_medal_count(wikitext)
+    competitors = wikitext_parser.extract_competitors(wikitext) if full_sweep else []
+    results = wikitext_parser.extract_results_from_sections(wikitext, include)
+
+    return medals, competitors, results, revision_id, revision_time, detected_time
+
 def update_data_from_wikipedia():
     """Main function to update data from Wikipedia"""
     print(f"Starting Wikipedia Olympics scraper at {datetime.utcnow().isoformat()}")
     print(f"Data source: {WIKIPEDIA_URL}")
 
     # Load current data
-    try:
-        with open('data.json', 'r', encoding='utf-8') as f:
-            current_data = json.load(f)
-    except FileNotFoundError:
-        current_data = {
-            "medals": {"gold": 0, "silver": 0, "bronze": 0},
-            "completed": [],
-            "upcoming": []
-        }
-
-    print(f"Current medals: Gold: {current_data['medals']['gold']}, "
-          f"Silver: {current_data['medals']['silver']}, "
-          f"Bronze: {current_data['medals']['bronze']}")
-
-    # Fetch Wikipedia page
-    page_content = fetch_url(WIKIPEDIA_URL)
-
-    if not page_content:
+    current_data = load_data()
+
+    print(f"Current medals: Gold: {current_data.medals.gold}, "
+          f"Silver: {current_data.medals.silver}, "
+          f"Bronze: {current_data.medals.bronze}")
+
+    # Only re-extract sports that can have new results, with a periodic full sweep
+    full_sweep = should_run_full_sweep()
+    live_sports = None
+    if not full_sweep:
+        live_sports = get_live_sports(current_data)
+        print(f"Live sports: {', '.join(sorted(live_sports)) or 'none'}")
+
+    engine = get_extraction_engine()
+    print(f"Extraction engine: {engine}")
+    if '--medals-only' in sys.argv:
+        extracted = extract_medals_only(get_stream_section())
+    elif engine == 'wikitext':
+        extracted = extract_from_wikitext(live_sports)
+    else:
+        extracted = extract_from_html(live_sports)
+
+    if not extracted:
         print("Failed to fetch Wikipedia page. Keeping existing data.")
         return
+    if full_sweep and '--medals-only' not in sys.argv:
+        record_full_sweep()
 
-    # Parse with BeautifulSoup
-    soup = BeautifulSoup(page_content, 'lxml')
-
-    # Extract medal count from infobox
-    medals = extract_medal_count_from_infobox(soup)
-    print(f"Scraped medals: Gold: {medals['gold']}, Silver: {medals['silver']}, Bronze: {medals['bronze']}")
-
-    # Extract competitor information
-    competitors = extract_competitors_table(soup)
-    results = extract_results_from_sections(soup)
+    medals, competitors, results, revision_id, revision_time, detected_time = extracted
+    medals = MedalTally.from_dict(medals)
+    print(f"Scraped medals: Gold: {medals.gold}, Silver: {medals.silver}, Bronze: {medals.bronze}")
 
     all_athletes = competitors + results
     print(f"Found {len(all_athletes)} athlete entries on Wikipedia")
@@ -345,18 +725,16 @@ def update_data_from_wikipedia():
         if athlete.get('medal'):
             print(f"    Medal: {athlete.get('medal')}")
 
-    # Update medal counts if they changed
-    old_medal_total = sum(current_data['medals'].values())
-    new_medal_total = sum(medals.values())
-
-    if new_medal_total > old_medal_total:
-        print("\n🏅 NEW MEDALS DETECTED! 🏅")
-        current_data['medals'] = medals
-    elif new_medal_total < old_medal_total:
-        print("\n⚠️ Warning: Medal count decreased. Keeping existing count to prevent data loss.")
+    # Let the consensus decide whether the tally changes (data.json is written there)
+    result = consensus.submit('wikipedia', medals, all_athletes, observed_at=detected_time)
+    if result.published:
+        print("\n🏅 NEW MEDAL TALLY PUBLISHED! 🏅")
+    elif not result.accepted:
+        print(f"\n⚠️ Warning: Wikipedia's tally was not accepted (confidence {result.confidence:.2f}). "
+              f"Keeping {result.medals}.")
     else:
         print("No change in medal count.")
-        current_data['medals'] = medals  # Update anyway to ensure consistency
+    current_data.medals = result.medals
 
     # Merge new athlete data (conservative approach)
     new_completed_athletes = merge_athlete_data(current_data, all_athletes)
@@ -364,20 +742,20 @@ def update_data_from_wikipedia():
     if new_completed_athletes:
         print(f"\nFound {len(new_completed_athletes)} new athletes to add:")
         for athlete in new_completed_athletes:
-            print(f"  + {athlete['name']}: {athlete['sport']}")
+            print(f"  + {athlete.name}: {athlete.sport}")
 
     # Note: We don't automatically add athletes to preserve manual updates
     # Operators should review Wikipedia and update data.json manually for athlete details
 
-    # Write updated data
-    with open('data.json', 'w', encoding='utf-8') as f:
-        json.dump(current_data, f, indent=2, ensure_ascii=False)
+    # Only count a write when data.json was actually rewritten
+    written_time = datetime.now(timezone.utc) if result.published else None
+    metrics.record_freshness('wikipedia', revision_time, detected_time, written_time, revision_id)
 
     print("\n" + "="*60)
     print(f"Update complete!")
-    print(f"Total medals: {sum(current_data['medals'].values())}")
-    print(f"Athletes tracked: {len(current_data.get('completed', []))} completed, "
-          f"{len(current_data.get('upcoming', []))} upcoming")
+    print(f"Total medals: {current_data.medals.total()}")
+    print(f"Athletes tracked: {len(current_data.completed)} completed, "
+          f"{len(current_data.upcoming)} upcoming")
     print("\nData source: Wikipedia (Estonia at the 2026 Winter Olympics)")
     print(f"URL: {WIKIPEDIA_URL}")
     print("\nNote: Athlete details should be manually verified and updated in data.json")
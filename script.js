@@ -1,6 +1,9 @@
 // Track previous medal state for snowflake trigger
 let previousTotalMedals = 0;
 
+// JSON of the data currently shown, so unchanged polls skip re-rendering
+let renderedDataJson = null;
+
 // Check if it's the last day of Olympics (Feb 22, 2026) - activates at 9PM Rome time on Feb 21
 function isLastDayOfOlympics() {
     // Target: 9PM Rome time on Feb 21, 2026 (which is 2026-02-21T20:00:00Z UTC)
@@ -26,6 +29,13 @@ async function loadData() {
         const data = await response.json();
         console.log('Data loaded - Completed:', data.completed.length, 'Upcoming:', data.upcoming.length);
 
+        // Page is already showing this data (prerendered or previous poll)
+        const dataJson = JSON.stringify(data);
+        if (dataJson === renderedDataJson) {
+            return;
+        }
+        renderedDataJson = dataJson;
+
         const currentTotal = data.medals.gold + data.medals.silver + data.medals.bronze;
 
         updateMedalAnswer(data.medals, currentTotal);
@@ -51,6 +61,35 @@ async function loadData() {
     }
 }
 
+// Read the data block prerendered into index.html by build_index.py
+function readInitialData() {
+    const element = document.getElementById('initialData');
+    if (!element) {
+        return null;
+    }
+
+    try {
+        return JSON.parse(element.textContent);
+    } catch (error) {
+        console.error('Error reading prerendered data:', error);
+        return null;
+    }
+}
+
+// Hydrate from prerendered data - the DOM is already rendered, only sync state
+function hydrateFromInitialData(data) {
+    renderedDataJson = JSON.stringify(data);
+    const total = data.medals.gold + data.medals.silver + data.medals.bronze;
+    previousTotalMedals = total;
+    console.log('Hydrated from prerendered data, hash:', document.getElementById('initialData').dataset.hash);
+
+    if (shouldShowSnowflakes(total)) {
+        // Start continuous snowflakes after a brief celebration
+        setTimeout(triggerSnowflakes, 500);
+        setTimeout(startContinuousSnowflakes, 4000); // Start continuous after initial burst
+    }
+}
+
 // Update the main Yes/No answer
 function updateMedalAnswer(medals, totalMedals) {
     const answerElement = document.getElementById('answer');
@@ -269,11 +308,18 @@ function handleScroll() {
 
 // Load data when page loads
 document.addEventListener('DOMContentLoaded', () => {
-    loadData();
-
     // Add scroll listener
     window.addEventListener('scroll', handleScroll, { passive: true });
 
+    const initialData = readInitialData();
+    if (initialData) {
+        // The page is already rendered - the 5-minute refresh below picks up newer data
+        hydrateFromInitialData(initialData);
+        return;
+    }
+
+    loadData();
+
     // Check on initial load if we have medals OR if it's the last day
     fetch('data.json?t=' + Date.now())
         .then(res => res.json())
@@ -0,0 +1,39 @@
+"""Revision timeline built by the Wikipedia backfill"""
+
+import unittest
+
+import backfill_wikipedia
+
+
+def tally(gold, silver, bronze):
+    return {'gold': gold, 'silver': silver, 'bronze': bronze}
+
+
+class BuildTimelineTest(unittest.TestCase):
+
+    def build(self, entries):
+        revisions = [{'revid': entry['revid'], 'timestamp': str(entry['revid'])} for entry in entries]
+        processed = {entry['revid']: dict(entry, timestamp=str(entry['revid'])) for entry in entries}
+        return backfill_wikipedia.build_timeline(revisions, processed)
+
+    def test_marks_tally_changes(self):
+        timeline = self.build([{'revid': 1, 'medals': tally(0, 0, 0)},
+                               {'revid': 2, 'medals': tally(0, 1, 0)},
+                               {'revid': 3, 'medals': tally(0, 1, 0)}])
+        self.assertEqual([entry['medals_changed'] for entry in timeline], [False, True, False])
+
+    def test_hidden_and_failed_revisions_are_not_changes(self):
+        timeline = self.build([{'revid': 1, 'medals': tally(0, 1, 0)},
+                               {'revid': 2, 'hidden': True},
+                               {'revid': 3, 'error': 'boom'},
+                               {'revid': 4, 'medals': tally(0, 1, 0)},
+                               {'revid': 5, 'error': 'boom'},
+                               {'revid': 6, 'medals': tally(1, 1, 0)}])
+        self.assertEqual([entry['medals_changed'] for entry in timeline],
+                         [False, False, False, False, False, True])
+        self.assertEqual(timeline[2]['error'], 'boom')
+        self.assertIsNone(timeline[2]['medals'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Medal consensus: weighting, publishing rules and the conflict log"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import consensus
+from models import MedalTally, OlympicsData, load_data, save_data
+
+
+class ConsensusTest(unittest.TestCase):
+
+    def setUp(self):
+        # consensus and models use paths relative to the working directory
+        self.previous_dir = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        save_data(OlympicsData(MedalTally(0, 1, 0)))
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        shutil.rmtree(self.directory)
+
+    def published(self):
+        return load_data().medals
+
+    def test_single_source_raise_needs_repeat(self):
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 1})
+        self.assertFalse(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 0))
+
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 1})
+        self.assertTrue(result.published)
+        self.assertTrue(result.accepted)
+        self.assertEqual(self.published(), MedalTally(0, 1, 1))
+
+    def test_two_agreeing_sources_raise_at_once(self):
+        consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 1})
+        result = consensus.submit('olympics.com', {'gold': 0, 'silver': 1, 'bronze': 1})
+        self.assertTrue(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 1))
+
+    def test_changing_reading_restarts_confirmation(self):
+        consensus.submit('wikipedia', {'gold': 5, 'silver': 0, 'bronze': 0})
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 1})
+        self.assertFalse(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 0))
+
+    def test_raise_then_revert(self):
+        # A vandalised infobox gets confirmed by a second run...
+        consensus.submit('wikipedia', {'gold': 5, 'silver': 0, 'bronze': 0})
+        consensus.submit('wikipedia', {'gold': 5, 'silver': 0, 'bronze': 0})
+        self.assertEqual(self.published(), MedalTally(5, 0, 0))
+
+        # ...and the same source reverting it restores the tally straight away
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 0})
+        self.assertTrue(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 0))
+
+    def test_err_alone_cannot_change_tally(self):
+        result = consensus.submit('err', {'gold': 3, 'silver': 1, 'bronze': 0})
+        self.assertFalse(result.published)
+        self.assertFalse(result.accepted)
+        self.assertEqual(self.published(), MedalTally(0, 1, 0))
+
+    def test_all_zero_tally_is_not_a_vote(self):
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 0, 'bronze': 0})
+        self.assertFalse(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 0))
+        self.assertNotIn('wikipedia', consensus.load_observations()['sources'])
+
+    def test_single_source_lower_needs_repeat(self):
+        save_data(OlympicsData(MedalTally(1, 1, 0)))
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 0})
+        self.assertFalse(result.published)
+        self.assertEqual(self.published(), MedalTally(1, 1, 0))
+
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 0})
+        self.assertTrue(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 0))
+
+    def test_two_agreeing_sources_lower_tally(self):
+        save_data(OlympicsData(MedalTally(1, 1, 0)))
+        consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 0})
+        result = consensus.submit('olympics.com', {'gold': 0, 'silver': 1, 'bronze': 0})
+        self.assertTrue(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 0))
+
+    def test_err_noise_does_not_block_reliable_source(self):
+        consensus.submit('err', {'gold': 3, 'silver': 1, 'bronze': 0})
+        consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 1})
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 1})
+        self.assertTrue(result.published)
+        self.assertEqual(self.published(), MedalTally(0, 1, 1))
+
+    def test_weight_halves_every_half_life(self):
+        now = 1_000_000.0
+        fresh = consensus.source_weight('wikipedia', now, now)
+        old = consensus.source_weight('wikipedia', now - consensus.HALF_LIFE_HOURS * 3600, now)
+        self.assertAlmostEqual(fresh, consensus.SOURCE_WEIGHTS['wikipedia'])
+        self.assertAlmostEqual(old, fresh / 2)
+
+    def test_stale_observations_are_dropped(self):
+        old = datetime.now(timezone.utc) - timedelta(hours=consensus.MAX_AGE_HOURS + 1)
+        consensus.submit('err', {'gold': 3, 'silver': 1, 'bronze': 0}, observed_at=old)
+        self.assertNotIn('err', consensus.load_observations()['sources'])
+
+    def test_conflict_logged_once(self):
+        consensus.submit('err', {'gold': 3, 'silver': 1, 'bronze': 0})
+        consensus.submit('err', {'gold': 3, 'silver': 1, 'bronze': 0})
+        with open(consensus.CONFLICT_LOG, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['kind'], 'medals')
+
+    def test_athlete_medal_conflict(self):
+        save_data(OlympicsData.from_dict({
+            'medals': {'gold': 0, 'silver': 1, 'bronze': 0},
+            'completed': [{'name': 'Henry Sildaru', 'sport': 'Freestyle Skiing', 'result': '2nd', 'medal': 'silver'}]
+        }))
+        result = consensus.submit('wikipedia', {'gold': 0, 'silver': 1, 'bronze': 0},
+                                  [{'name': 'Henry  Sildaru', 'sport': 'Freestyle skiing', 'result': '1', 'medal': 'gold'}])
+        self.assertTrue(result.accepted)
+        athlete_conflicts = [c for c in result.conflicts if c['kind'] == 'athlete']
+        self.assertEqual([c['name'] for c in athlete_conflicts], ['henry sildaru'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""data.json records and the exact-layout serializer"""
+
+import os
+import unittest
+from unittest import mock
+
+import models
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data.json')
+
+SAMPLE = '''{
+  "medals": {
+    "gold": 0,
+    "silver": 1,
+    "bronze": 0
+  },
+  "completed": [
+    {
+      "name": "Henry Sildaru",
+      "sport": "Freestyle Skiing - Men's Halfpipe",
+      "datetime": "Feb 20, 2026 - 11:30 AM CET",
+      "result": "SILVER MEDAL! 🥈 (score: 93.00)",
+      "medal": "silver",
+      "note": "kept as-is"
+    }
+  ],
+  "upcoming": [
+    {
+      "name": "Tuuli Tomingas",
+      "sport": "Biathlon - Women's Mass Start",
+      "datetime": "Feb 21, 2026 - TBD"
+    }
+  ]
+}'''
+
+
+def read_data_file():
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class RoundTripTest(unittest.TestCase):
+
+    def assert_round_trip(self, text):
+        self.assertEqual(models.dumps_data(models.loads_data(text)), text)
+
+    def test_data_json_round_trip_with_json(self):
+        with mock.patch.object(models, 'orjson', None):
+            self.assert_round_trip(read_data_file())
+            self.assert_round_trip(SAMPLE)
+
+    @unittest.skipIf(models.orjson is None, "orjson is not installed")
+    def test_data_json_round_trip_with_orjson(self):
+        self.assert_round_trip(read_data_file())
+        self.assert_round_trip(SAMPLE)
+
+    def test_extra_keys_are_kept_and_only_allocated_when_present(self):
+        data = models.loads_data(SAMPLE)
+        self.assertEqual(data.completed[0].extra, {'note': 'kept as-is'})
+        self.assertIsNone(data.upcoming[0].extra)
+
+
+class ValidationTest(unittest.TestCase):
+
+    def test_rejects_invalid_medal_counts(self):
+        for count in (-1, '1', 1.0, True):
+            with self.assertRaises(ValueError):
+                models.MedalTally(gold=count)
+
+    def test_rejects_invalid_athlete_entries(self):
+        with self.assertRaises(ValueError):
+            models.AthleteEntry('', 'Biathlon')
+        with self.assertRaises(ValueError):
+            models.AthleteEntry('Rene Zahkna', 'Biathlon', medal='platinum')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""ERR article-body extraction and cross-feed deduplication"""
+
+import unittest
+
+import scraper_err
+
+
+class ProcessArticleBodyTest(unittest.TestCase):
+
+    def test_placement_needs_estonian_in_same_sentence(self):
+        body = "Norralane Johansen sai 3. koht. Eesti laskesuusataja Kristo Siimer sai 31. koht."
+        self.assertEqual(scraper_err.process_article_body(body)['placement'], '31th place')
+
+    def test_ordinary_words_are_not_athletes(self):
+        # tuul = wind, laine = wave, külm = cold
+        for body in ("Tuule tõttu sai norralane Johansen 6. koht.",
+                     "Laine oli kõrge ja Granerud sai 3. koht.",
+                     "Külm ilm ei seganud, Lindvik sai 2. koht."):
+            self.assertIsNone(scraper_err.process_article_body(body)['placement'], body)
+
+    def test_inflected_names_count(self):
+        body = "Kristjan Ilvese tulemus oli 6. koht."
+        self.assertEqual(scraper_err.process_article_body(body)['placement'], '6th place')
+
+    def test_foreign_medals_are_not_estonian(self):
+        body = "Norway took the gold medal in the relay. Estonia finished 12th place."
+        self.assertEqual(scraper_err.process_article_body(body)['medals'],
+                         {'gold': 0, 'silver': 0, 'bronze': 0})
+
+
+class DeduplicationTest(unittest.TestCase):
+
+    def test_canonical_link_shared_across_subdomains(self):
+        links = ['https://sport.err.ee/1609912345/eesti-sai-medali',
+                 'https://www.err.ee/1609912345/eesti-sai-medali?utm_source=rss',
+                 'http://NEWS.err.ee/1609912345/estonia-wins-medal/']
+        self.assertEqual({scraper_err.canonical_link(link) for link in links}, {'err:1609912345'})
+
+    def test_canonical_link_without_story_id(self):
+        self.assertEqual(scraper_err.canonical_link('http://Example.com/story/?a=1'),
+                         'https://example.com/story')
+        self.assertEqual(scraper_err.canonical_link(''), '')
+
+    def test_same_story_from_several_feeds_kept_once(self):
+        articles = [
+            {'title': 'Eesti sai medali!', 'link': 'https://sport.err.ee/1609912345/eesti-sai-medali', 'guid': 'a'},
+            {'title': 'Eesti sai medali', 'link': 'https://www.err.ee/1609912345/eesti-sai-medali', 'guid': 'b'},
+            # Same headline under a different id (republished story)
+            {'title': 'EESTI SAI MEDALI', 'link': 'https://news.err.ee/1609999999/x', 'guid': 'c'},
+            {'title': 'Kelly Sildaru finaali', 'link': 'https://sport.err.ee/1609900000/sildaru', 'guid': 'd'},
+        ]
+        unique = scraper_err.deduplicate_articles(articles)
+        self.assertEqual([article['guid'] for article in unique], ['a', 'd'])
+
+    def test_seen_keys_carry_over_between_calls(self):
+        seen = set()
+        first = [{'title': 'Ilves kuues', 'link': 'https://sport.err.ee/1609911111/ilves'}]
+        again = [{'title': 'Ilves kuues (uuendatud)', 'link': 'https://www.err.ee/1609911111/ilves'}]
+        self.assertEqual(len(scraper_err.deduplicate_articles(first, seen)), 1)
+        self.assertEqual(scraper_err.deduplicate_articles(again, seen), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
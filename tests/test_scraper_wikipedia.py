@@ -0,0 +1,94 @@
+"""Command-line options and live-section selection of the Wikipedia scraper"""
+
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import scraper_wikipedia
+from models import OlympicsData, ScheduledEvent
+
+
+class ExtractionEngineTest(unittest.TestCase):
+
+    def test_default_and_override(self):
+        with mock.patch.object(sys, 'argv', ['scraper_wikipedia.py']):
+            self.assertEqual(scraper_wikipedia.get_extraction_engine(), scraper_wikipedia.EXTRACTION_ENGINE)
+        with mock.patch.object(sys, 'argv', ['scraper_wikipedia.py', '--engine=wikitext']):
+            self.assertEqual(scraper_wikipedia.get_extraction_engine(), 'wikitext')
+
+    def test_rejects_unknown_engine(self):
+        with mock.patch.object(sys, 'argv', ['scraper_wikipedia.py', '--engine=wikitxt']):
+            with self.assertRaises(ValueError):
+                scraper_wikipedia.get_extraction_engine()
+
+
+class ParseScheduleDatetimeTest(unittest.TestCase):
+
+    def test_time_is_cet(self):
+        start, has_time = scraper_wikipedia.parse_schedule_datetime('Feb 12, 2026 - 2:15 PM CET')
+        self.assertTrue(has_time)
+        self.assertEqual(start, datetime(2026, 2, 12, 13, 15, tzinfo=timezone.utc))
+
+    def test_tbd_time(self):
+        start, has_time = scraper_wikipedia.parse_schedule_datetime('Feb 14, 2026 - TBD')
+        self.assertFalse(has_time)
+        self.assertEqual(start, datetime(2026, 2, 13, 23, 0, tzinfo=timezone.utc))
+
+    def test_unreadable(self):
+        self.assertEqual(scraper_wikipedia.parse_schedule_datetime('TBD'), (None, False))
+        self.assertEqual(scraper_wikipedia.parse_schedule_datetime(''), (None, False))
+
+
+class GetLiveSportsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = OlympicsData(upcoming=[
+            ScheduledEvent('Rene Zahkna', "Biathlon - Men's Sprint", 'Feb 12, 2026 - 2:15 PM CET'),
+            ScheduledEvent('Tuuli Tomingas', "Cross-Country Skiing - Women's Sprint", 'Feb 14, 2026 - TBD'),
+        ])
+
+    def live_at(self, *args):
+        return scraper_wikipedia.get_live_sports(self.data, datetime(*args, tzinfo=timezone.utc))
+
+    def test_within_window(self):
+        self.assertEqual(self.live_at(2026, 2, 12, 13, 15), {'biathlon'})
+        self.assertEqual(self.live_at(2026, 2, 12, 19, 0), {'biathlon'})
+
+    def test_outside_window(self):
+        self.assertEqual(self.live_at(2026, 2, 12, 13, 0), set())
+        self.assertEqual(self.live_at(2026, 2, 12, 19, 30), set())
+
+    def test_tbd_day_is_live_all_day(self):
+        self.assertEqual(self.live_at(2026, 2, 13, 23, 0), {'cross country skiing'})
+        self.assertEqual(self.live_at(2026, 2, 14, 23, 30), {'cross country skiing'})
+        self.assertEqual(self.live_at(2026, 2, 15, 5, 30), set())
+
+
+class FullSweepTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(sys, 'argv', ['scraper_wikipedia.py'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = datetime(2026, 2, 12, 13, 5, tzinfo=timezone.utc)
+
+    def test_sweeps_when_never_swept(self):
+        with mock.patch.object(scraper_wikipedia, 'load_last_full_sweep', return_value=None):
+            self.assertTrue(scraper_wikipedia.should_run_full_sweep(self.now))
+
+    def test_sweeps_once_old_enough_regardless_of_hour(self):
+        hours = scraper_wikipedia.FULL_SWEEP_EVERY_HOURS
+        self.assertFalse(scraper_wikipedia.should_run_full_sweep(self.now, self.now - timedelta(hours=hours - 1)))
+        # A scheduled run that starts a few minutes late still sweeps
+        self.assertTrue(scraper_wikipedia.should_run_full_sweep(self.now, self.now - timedelta(hours=hours, minutes=-5)))
+        # A missed run only postpones the sweep to the next run
+        self.assertTrue(scraper_wikipedia.should_run_full_sweep(self.now, self.now - timedelta(hours=hours + 7)))
+
+    def test_full_flag(self):
+        with mock.patch.object(sys, 'argv', ['scraper_wikipedia.py', '--full']):
+            self.assertTrue(scraper_wikipedia.should_run_full_sweep(self.now, self.now))
+
+
+if __name__ == '__main__':
+    unittest.main()
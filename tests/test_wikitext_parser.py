@@ -0,0 +1,89 @@
+"""Wikitext extraction against a fixture of the Estonia 2026 article"""
+
+import os
+import unittest
+
+import wikitext_parser
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'estonia_at_2026_winter_olympics.wiki')
+
+
+def load_fixture():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class ExtractMedalCountTest(unittest.TestCase):
+
+    def test_reads_infobox(self):
+        self.assertEqual(wikitext_parser.extract_medal_count(load_fixture()),
+                         {'gold': 0, 'silver': 1, 'bronze': 0})
+
+    def test_falls_back_to_medalists_table(self):
+        wikitext = load_fixture().replace('| silver = 1', '').replace('| gold = 0', '').replace('| bronze = 0', '')
+        self.assertEqual(wikitext_parser.extract_medal_count(wikitext),
+                         {'gold': 0, 'silver': 1, 'bronze': 0})
+
+    def test_no_infobox_or_medalists_is_all_zero(self):
+        self.assertEqual(wikitext_parser.extract_medal_count('==Biathlon==\nNothing yet.'),
+                         {'gold': 0, 'silver': 0, 'bronze': 0})
+
+
+class ExtractResultsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.results = wikitext_parser.extract_results_from_sections(load_fixture())
+
+    def find(self, name, sport):
+        return next(r for r in self.results if r['name'] == name and r['sport'] == sport)
+
+    def test_rank_template_renders_as_rank(self):
+        henry = self.find('Henry Sildaru', 'Freestyle skiing')
+        self.assertEqual(henry['result'], '2')
+        self.assertEqual(henry['medal'], 'silver')
+        self.assertEqual(henry['event'], "Men's halfpipe")
+
+    def test_sortname_and_links_are_plain_text(self):
+        names = {r['name'] for r in self.results if r['sport'] == 'Biathlon'}
+        self.assertEqual(names, {'Rene Zahkna', 'Kristo Siimer'})
+
+    def test_level_four_headings_stay_in_parent_section(self):
+        # ====Men==== / ====Women==== must not become sections of their own
+        self.assertFalse(any(r['sport'].startswith('=') or r['sport'] in ('Men', 'Women') for r in self.results))
+        self.assertEqual(len([r for r in self.results if r['name'] == 'Rene Zahkna']), 1)
+        titles = [title for _, title, _ in wikitext_parser.split_sections(load_fixture())]
+        self.assertNotIn('=Men=', titles)
+        biathlon = next(body for _, title, body in wikitext_parser.split_sections(load_fixture()) if title == 'Biathlon')
+        self.assertIn('====Women====', biathlon)
+
+    def test_skips_reference_sections(self):
+        self.assertFalse(any(r['sport'] in ('See also', 'References') for r in self.results))
+
+    def test_include_limits_sections(self):
+        results = wikitext_parser.extract_results_from_sections(load_fixture(), include=lambda title: title == 'Biathlon')
+        self.assertEqual({r['sport'] for r in results}, {'Biathlon'})
+
+
+class ExtractCompetitorsTest(unittest.TestCase):
+
+    def test_medalist_rows_carry_medal(self):
+        competitors = wikitext_parser.extract_competitors(load_fixture())
+        medalists = [c for c in competitors if c.get('medal')]
+        self.assertTrue(medalists)
+        self.assertTrue(all(c['name'] == 'Henry Sildaru' and c['medal'] == 'silver' for c in medalists))
+
+
+class StripMarkupTest(unittest.TestCase):
+
+    def test_rank_templates(self):
+        self.assertEqual(wikitext_parser.strip_markup('{{Gold1}}'), '1')
+        self.assertEqual(wikitext_parser.strip_markup('{{silver2}}'), '2')
+        self.assertEqual(wikitext_parser.strip_markup('{{Bronze3}}'), '3')
+
+    def test_refs_comments_and_links(self):
+        text = "[[Kristjan Ilves|Ilves]]<ref>{{cite web|url=x}}</ref> ''6th''<!-- note -->"
+        self.assertEqual(wikitext_parser.strip_markup(text), 'Ilves 6th')
+
+
+if __name__ == '__main__':
+    unittest.main()
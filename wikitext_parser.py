@@ -0,0 +1,357 @@
+"""
+Wikitext extraction engine for the Wikipedia scraper
+Parses the raw wikitext of "Estonia at the 2026 Winter Olympics" (infobox
+template, medal templates and table markup) into the same medal and athlete
+structures the HTML extractors in scraper_wikipedia.py produce. No network
+access here - callers fetch the wikitext through the MediaWiki API.
+"""
+
+import re
+
+MEDAL_TYPES = ('gold', 'silver', 'bronze')
+
+# Medals appear as {{Gold medal}}, {{Medal|Silver}}, {{bronze3}}, bgcolor=gold, background:#ffd700 ...
+MEDAL_MARKERS = {
+    'gold': re.compile(r'\{\{\s*(gold\s*medal|medal\s*\|\s*gold|gold1)\s*[|}]|bgcolor\s*=\s*"?gold|#ffd700|background:\s*gold', re.I),
+    'silver': re.compile(r'\{\{\s*(silver\s*medal|medal\s*\|\s*silver|silver2)\s*[|}]|bgcolor\s*=\s*"?silver|#c0c0c0|background:\s*silver', re.I),
+    'bronze': re.compile(r'\{\{\s*(bronze\s*medal|medal\s*\|\s*bronze|bronze3)\s*[|}]|bgcolor\s*=\s*"?(bronze|#cc9966)|#cd7f32|background:\s*(bronze|#cc9966)', re.I),
+}
+
+RANK_TEMPLATES = {'gold1': '1', 'silver2': '2', 'bronze3': '3'}
+
+SKIP_SECTIONS = ['contents', 'references', 'external links', 'see also', 'notes']
+
+# Any heading level is matched so ====Men==== isn't read as a level-3 "=Men=";
+# split_sections then keeps h2/h3 only (like the HTML extractor)
+HEADING_RE = re.compile(r'^(=+)\s*(.+?)\s*\1\s*$', re.M)
+SECTION_LEVELS = (2, 3)
+
+
+def find_template(wikitext, name):
+    """Return the full text of the first {{name ...}} template (balanced braces)"""
+    match = re.search(r'\{\{\s*' + name, wikitext, re.I)
+    if not match:
+        return None
+
+    depth = 0
+    i = match.start()
+    while i < len(wikitext) - 1:
+        pair = wikitext[i:i + 2]
+        if pair == '{{':
+            depth += 1
+            i += 2
+        elif pair == '}}':
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return wikitext[match.start():i]
+        else:
+            i += 1
+    return None
+
+
+def replace_simple_templates(text):
+    """Replace the inline templates we can render, drop the rest"""
+    def render(match):
+        parts = [p.strip() for p in match.group(1).split('|')]
+        name = parts[0].lower()
+        args = [p for p in parts[1:] if '=' not in p]
+        if name in ('sortname', 'sort name') and len(args) >= 2:
+            return f"{args[0]} {args[1]}"
+        if name in ('nowrap', 'nobr', 'small', 'center', 'sort', 'abbr', 'dts') and args:
+            return args[-1] if name == 'sort' else args[0]
+        if name in ('dnf', 'dns', 'dsq', 'dnq'):
+            return name.upper()
+        # Rank cells: {{Gold1}} renders as 1 (with a gold background)
+        if name in RANK_TEMPLATES:
+            return RANK_TEMPLATES[name]
+        return ''
+
+    # Innermost templates first until none are left
+    previous = None
+    while previous != text:
+        previous = text
+        text = re.sub(r'\{\{([^{}]*)\}\}', render, text)
+    return text
+
+
+def strip_markup(text):
+    """Convert a wikitext fragment to plain text"""
+    text = re.sub(r'<!--.*?-->', '', text, flags=re.S)
+    text = re.sub(r'<ref[^>]*/>', '', text)
+    text = re.sub(r'<ref[^>]*>.*?</ref>', '', text, flags=re.S)
+    text = re.sub(r'<br\s*/?>', ' ', text)
+    text = replace_simple_templates(text)
+    text = re.sub(r'\[\[(?:[^\]|]*\|)?([^\]]*)\]\]', r'\1', text)
+    text = re.sub(r'\[https?://\S+\s+([^\]]*)\]', r'\1', text)
+    text = re.sub(r"'{2,}", '', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    return ' '.join(text.split())
+
+
+def split_cells(line, separator):
+    """Split a table line on || or !! outside links and templates"""
+    cells = []
+    depth = 0
+    current = ''
+    i = 0
+    while i < len(line):
+        pair = line[i:i + 2]
+        if pair in ('[[', '{{'):
+            depth += 1
+            current += pair
+            i += 2
+        elif pair in (']]', '}}'):
+            depth = max(0, depth - 1)
+            current += pair
+            i += 2
+        elif pair == separator and depth == 0:
+            cells.append(current)
+            current = ''
+            i += 2
+        else:
+            current += line[i]
+            i += 1
+    cells.append(current)
+    return cells
+
+
+def split_cell_attributes(cell):
+    """Split 'style="..." | content' into (attributes, content)"""
+    depth = 0
+    for i, char in enumerate(cell):
+        pair = cell[i:i + 2]
+        if pair in ('[[', '{{'):
+            depth += 1
+        elif pair in (']]', '}}'):
+            depth = max(0, depth - 1)
+        elif char == '|' and depth == 0 and cell[i + 1:i + 2] != '|':
+            attributes = cell[:i]
+            if '=' in attributes and '[[' not in attributes and '{{' not in attributes:
+                return attributes, cell[i + 1:]
+            break
+    return '', cell
+
+
+def find_table_spans(text):
+    """Return (start, end) of each top-level {| ... |} table"""
+    spans = []
+    depth = 0
+    start = None
+    for match in re.finditer(r'^\s*(\{\||\|\})', text, re.M):
+        if match.group(1) == '{|':
+            if depth == 0:
+                start = match.start(1)
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0:
+                spans.append((start, match.end()))
+    return spans
+
+
+def find_tables(text):
+    """Return the wikitext of each top-level {| ... |} table"""
+    return [text[start:end] for start, end in find_table_spans(text)]
+
+
+def parse_table(table):
+    """Parse a wikitable into (attributes, header names, rows of raw cells)"""
+    lines = table.split('\n')
+    attributes = lines[0][2:].strip()
+    rows = []
+    current = []
+
+    for line in lines[1:]:
+        stripped = line.strip()
+        if stripped.startswith('|-') or stripped.startswith('|}'):
+            if current:
+                rows.append(current)
+            current = []
+        elif stripped.startswith('|+'):
+            continue
+        elif stripped.startswith('!'):
+            current.extend(('th', cell) for cell in split_cells(stripped[1:], '!!'))
+        elif stripped.startswith('|'):
+            current.extend(('td', cell) for cell in split_cells(stripped[1:], '||'))
+        elif current:
+            # Continuation of the previous cell's content
+            kind, cell = current[-1]
+            current[-1] = (kind, cell + ' ' + stripped)
+    if current:
+        rows.append(current)
+
+    if not rows:
+        return attributes, [], []
+
+    headers = [strip_markup(split_cell_attributes(cell)[1]).lower() for _, cell in rows[0]]
+    return attributes, headers, rows[1:]
+
+
+def detect_medal(text):
+    """Medal colour referenced in a cell's markup, if any"""
+    for medal_type in MEDAL_TYPES:
+        if MEDAL_MARKERS[medal_type].search(text):
+            return medal_type
+    return None
+
+
+def is_wikitable(attributes):
+    return 'wikitable' in attributes
+
+
+def extract_medal_count(wikitext):
+    """Extract Estonia's medal tally (infobox first, medalists table as fallback)"""
+    medals = {'gold': 0, 'silver': 0, 'bronze': 0}
+
+    infobox = find_template(wikitext, r'Infobox\s+country\s+at\s+games')
+    if infobox:
+        found = False
+        for medal_type in MEDAL_TYPES:
+            match = re.search(r'\|\s*' + medal_type + r'\s*=\s*(\d+)', infobox, re.I)
+            if match:
+                medals[medal_type] = int(match.group(1))
+                found = True
+        if found:
+            return medals
+
+    # Fallback: count medal templates in the Medalists section
+    for _, title, body in split_sections(wikitext):
+        if 'medalist' not in title.lower():
+            continue
+        for table in find_tables(body):
+            _, _, rows = parse_table(table)
+            for row in rows:
+                medal = detect_medal(' '.join(cell for _, cell in row))
+                if medal:
+                    medals[medal] += 1
+    return medals
+
+
+def split_sections(wikitext, with_offsets=False):
+    """Split wikitext into (level, title, body) for each h2/h3 heading
+
+    Deeper headings stay part of their parent section's body.
+    With with_offsets, each tuple also carries the body's start offset.
+    """
+    sections = []
+    matches = [match for match in HEADING_RE.finditer(wikitext) if len(match.group(1)) in SECTION_LEVELS]
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(wikitext)
+        section = (len(match.group(1)), strip_markup(match.group(2)), wikitext[match.end():end])
+        sections.append(section + (match.end(),) if with_offsets else section)
+    return sections
+
+
+def extract_competitors(wikitext):
+    """Competitor rows from athlete/sport tables (mirrors extract_competitors_table)"""
+    competitors = []
+
+    for table in find_tables(wikitext):
+        attributes, headers, rows = parse_table(table)
+        if not is_wikitable(attributes):
+            continue
+
+        # Skip medal tables
+        table_text = table.lower()
+        if 'medal' in table_text and 'total' in table_text:
+            continue
+
+        has_athlete_col = any('athlete' in h or 'name' in h for h in headers)
+        has_sport_col = any('sport' in h or 'event' in h or 'discipline' in h for h in headers)
+        if not (has_athlete_col or has_sport_col):
+            continue
+
+        for row in rows:
+            if len(row) < 2 or all(kind == 'th' for kind, _ in row):
+                continue
+
+            name = sport = result = ''
+            medal = None
+            for i, (_, cell) in enumerate(row):
+                cell_attributes, content = split_cell_attributes(cell)
+                cell_text = strip_markup(content)
+                header = headers[i] if i < len(headers) else ''
+
+                if 'athlete' in header or 'name' in header:
+                    name = cell_text
+                if 'sport' in header or 'event' in header or 'discipline' in header:
+                    sport = cell_text
+                if 'result' in header or 'position' in header or 'place' in header:
+                    result = cell_text
+
+                medal = detect_medal(cell) or medal
+
+            if name or sport:
+                competitor = {'name': name, 'sport': sport}
+                if result:
+                    competitor['result'] = result
+                if medal:
+                    competitor['medal'] = medal
+                competitors.append(competitor)
+
+    return competitors
+
+
+def extract_results_from_sections(wikitext, include=None):
+    """Athlete rows from the first wikitable after each sport heading
+    (mirrors extract_results_from_sections in scraper_wikipedia.py)
+
+    include, if given, is called with each top-level (h2) section title and
+    limits extraction to sections it returns True for, plus their subsections.
+    """
+    results = []
+    sections = split_sections(wikitext, with_offsets=True)
+    wikitables = [(start, wikitext[start:end]) for start, end in find_table_spans(wikitext)
+                  if is_wikitable(wikitext[start:end].split('\n', 1)[0])]
+    top_level_title = ''
+
+    for level, sport_name, _, offset in sections:
+        if level == 2:
+            top_level_title = sport_name
+
+        if any(skip in sport_name.lower() for skip in SKIP_SECTIONS):
+            continue
+        if include is not None and not include(top_level_title):
+            continue
+
+        # Like BeautifulSoup's find_next, the next table may sit in a later section
+        table = next((t for start, t in wikitables if start >= offset), None)
+        if not table:
+            continue
+
+        _, headers, rows = parse_table(table)
+        for row in rows:
+            # Skip short rows and extra header rows (multi-row headers)
+            if len(row) < 2 or all(kind == 'th' for kind, _ in row):
+                continue
+
+            athlete_data = {
+                'sport': sport_name,
+                'name': '',
+                'event': '',
+                'result': ''
+            }
+
+            for i, (_, cell) in enumerate(row):
+                cell_attributes, content = split_cell_attributes(cell)
+                cell_text = strip_markup(content)
+
+                if i < len(headers):
+                    if 'athlete' in headers[i] or 'name' in headers[i]:
+                        athlete_data['name'] = cell_text
+                    elif 'event' in headers[i]:
+                        athlete_data['event'] = cell_text
+                    elif 'result' in headers[i] or 'place' in headers[i] or 'rank' in headers[i]:
+                        athlete_data['result'] = cell_text
+                    elif 'date' in headers[i]:
+                        athlete_data['date'] = cell_text
+
+                medal = detect_medal(cell)
+                if medal:
+                    athlete_data['medal'] = medal
+
+            if athlete_data['name'] or athlete_data['event']:
+                results.append(athlete_data)
+
+    return results